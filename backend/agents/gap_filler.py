@@ -5,25 +5,36 @@ Detects cancellations and automatically notifies the waitlist via SMS
 to fill the open slot.
 """
 
-from backend.services.sms import send_sms
+from backend.services.sms import queue_sms
 from backend.database import (
-    cancel_booking,
-    get_waitlist_for_service,
-    mark_waitlist_notified,
+    cancel_booking_and_claim_waitlist,
     create_booking,
     log_event,
 )
 from backend.studio_config import get_studio_config
+from backend.utils import first_name
+
+_AFFIRMATIVE_REPLIES = frozenset({
+    "yes", "yep", "yeah", "y", "sure", "ok", "grab it", "i want it",
+    "yes please", "yes!", "book it",
+})
+
+
+_GAP_FILL_TEMPLATE = (
+    "Hey {first_name}! A spot just opened up for {service} "
+    "on {time_slot}. Want it? Reply YES to grab it before it's gone! "
+    "— {studio_name}"
+)
 
 
 def _build_gap_fill_sms(client_name: str, service: str, time_slot: str, studio_name: str = "Beauty OS") -> str:
     """Build the waitlist notification SMS."""
-    first_name = client_name.split()[0]
-    return (
-        f"Hey {first_name}! A spot just opened up for {service} "
-        f"on {time_slot}. Want it? Reply YES to grab it before it's gone! "
-        f"— {studio_name}"
-    )
+    return _GAP_FILL_TEMPLATE.format_map({
+        "first_name": first_name(client_name),
+        "service": service,
+        "time_slot": time_slot,
+        "studio_name": studio_name,
+    })
 
 
 def handle_cancellation(
@@ -35,9 +46,9 @@ def handle_cancellation(
 ) -> dict:
     """
     Process a booking cancellation:
-    1. Mark the booking as cancelled.
-    2. Find waitlisted clients for the same service.
-    3. Notify the top waitlisted client via SMS.
+    1. Mark the booking as cancelled and claim the top waitlisted client
+       for the same service (one DB transaction).
+    2. Notify that client via SMS.
     """
     # Get studio name for SMS
     studio_name = "Beauty OS"
@@ -46,8 +57,8 @@ def handle_cancellation(
         if config:
             studio_name = config["studio"]["name"]
 
-    # Step 1: Cancel the booking
-    cancel_booking(booking_id)
+    # Step 1: Cancel the booking and claim the next waitlisted client
+    next_client = cancel_booking_and_claim_waitlist(booking_id, service, studio_id=studio_id)
     log_event(
         agent="gap_filler",
         action="cancellation_detected",
@@ -55,10 +66,7 @@ def handle_cancellation(
         studio_id=studio_id,
     )
 
-    # Step 2: Find waitlisted clients
-    waitlist = get_waitlist_for_service(service, studio_id=studio_id)
-
-    if not waitlist:
+    if not next_client:
         log_event(
             agent="gap_filler",
             action="no_waitlist",
@@ -71,8 +79,7 @@ def handle_cancellation(
             "reason": "No one on waitlist for this service.",
         }
 
-    # Step 3: Notify the first person on the waitlist
-    next_client = waitlist[0]
+    # Step 2: Notify the claimed client
     sms_body = _build_gap_fill_sms(
         client_name=next_client["client_name"],
         service=service,
@@ -81,12 +88,10 @@ def handle_cancellation(
     )
 
     if next_client.get("client_phone"):
-        sid = send_sms(to=next_client["client_phone"], body=sms_body)
+        sid = queue_sms(to=next_client["client_phone"], body=sms_body, studio_id=studio_id)
     else:
         sid = "no_phone"
 
-    mark_waitlist_notified(next_client["id"])
-
     log_event(
         agent="gap_filler",
         action="waitlist_notified",
@@ -119,10 +124,8 @@ def handle_gap_fill_reply(
     Handle an inbound SMS reply from a waitlisted client.
     If affirmative, create a new booking for the open slot.
     """
-    affirmative = reply_text.strip().lower() in (
-        "yes", "yep", "yeah", "y", "sure", "ok", "grab it", "i want it",
-        "yes please", "yes!", "book it",
-    )
+    normalized = reply_text.strip().lower()
+    affirmative = normalized in _AFFIRMATIVE_REPLIES
 
     if affirmative:
         booking_id = create_booking(
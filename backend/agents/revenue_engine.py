@@ -6,18 +6,45 @@ cross-references the studio's add-on catalog from DB, and sends a
 personalized upsell SMS.
 """
 
-from backend.services.llm import call_llm_json
+import asyncio
+import hashlib
+import logging
+import threading
+
+import orjson
+
+from backend.cache import TTLCache
+from backend.services.llm import call_llm_json, llm_breaker
 from backend.services.sms import send_sms
 from backend.database import (
-    get_upcoming_bookings_in_window,
+    upcoming_booking_window,
+    get_upcoming_bookings_page,
     get_addons_for_studio,
-    get_services_for_studio,
-    get_addons_for_service,
+    get_services_with_addons,
     add_upsell_to_booking,
     log_event,
 )
-from backend.studio_config import get_studio_config
-from config.settings import UPSELL_LEAD_TIME_HOURS
+from backend.studio_config import get_studio_config, get_cached_prompt
+from backend.utils import first_name
+from config.settings import UPSELL_LEAD_TIME_HOURS, UPSELL_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+_AFFIRMATIVE_REPLIES = frozenset({
+    "yes", "yep", "yeah", "y", "sure", "ok", "add it", "do it",
+    "yes please", "yes!", "yesss",
+})
+
+# Twilio sends can sit in the sending number's token bucket for seconds; cap how
+# many executor threads they hold so LLM calls and DB prefetches aren't starved.
+_SMS_CONCURRENCY = 4
+
+# LLM-drafted SMS templates keyed by studio/service/add-on/voice (24h)
+_upsell_template_cache = TTLCache(maxsize=2048, ttl=86400)
+# Striped so concurrent misses on one key share an LLM call without
+# keeping a lock per key forever
+_TEMPLATE_LOCK_STRIPES = 64
+_template_locks = tuple(threading.Lock() for _ in range(_TEMPLATE_LOCK_STRIPES))
 
 
 # ── Dynamic Prompt Builder ───────────────────────────────────────────
@@ -31,118 +58,246 @@ def _build_upsell_prompt(config: dict) -> str:
 
 Write a SHORT, cheeky, friendly upsell text message (under 160 characters if possible,
 max 320 characters). The message should:
-1. Greet the client by first name.
+1. Greet the client by first name, written as the literal placeholder {{first_name}}
+   (it is filled in per client before sending).
 2. Mention their booked service and confirm the appointment is tomorrow.
 3. Pitch the add-on naturally using the provided pitch line.
 4. End with "Reply YES to add it!" or similar CTA.
 
 Tone: {voice['sms_tone']}. Use {voice['emoji_limit']}.
-
-RESPOND WITH VALID JSON ONLY:
-{{
-    "sms_body": "The full SMS text"
-}}
 """
 
 
-def _find_best_addon(service_name: str, studio_id: str) -> dict | None:
-    """Look up the best add-on for a given service from the DB."""
-    services = get_services_for_studio(studio_id)
+_UPSELL_SCHEMA = {
+    "type": "object",
+    "properties": {"sms_body": {"type": "string", "description": "The full SMS text."}},
+    "required": ["sms_body"],
+}
 
-    # Find the matching service
-    service_name_lower = service_name.lower().strip()
-    for svc in services:
-        if svc["name"].lower() in service_name_lower or service_name_lower in svc["name"].lower():
-            addons = get_addons_for_service(svc["id"])
-            if addons:
-                return addons[0]  # Top recommendation
 
-    # Check all addons for the studio as fallback
+def _load_addon_index(studio_id: str) -> dict:
+    """
+    Prefetch everything `_find_best_addon` needs for a studio, with service
+    names lowercased once up front:
+        {
+            "by_name": {service name (lower): top add-on},
+            "names": [(service name (lower), top add-on), ...],  # menu order
+            "fallback": first studio add-on or None,
+        }
+    Services without add-ons are left out since they can never match.
+    """
+    names = [
+        (svc["name"].lower().strip(), svc["addons"][0])
+        for svc in get_services_with_addons(studio_id)
+        if svc["addons"]
+    ]
     all_addons = get_addons_for_studio(studio_id)
-    if all_addons:
-        return all_addons[0]
+    return {
+        "by_name": dict(reversed(names)),  # first service wins on duplicate names
+        "names": names,
+        "fallback": all_addons[0] if all_addons else None,
+    }
+
+
+def _find_best_addon(service_name: str, addon_index: dict) -> dict | None:
+    """Pick the best add-on for a given service from a prefetched studio index."""
+    service_name_lower = service_name.lower().strip()
+
+    # Exact service name match
+    addon = addon_index["by_name"].get(service_name_lower)
+    if addon:
+        return addon
+
+    # Partial match, e.g. "Brazilian Wax + Brow" booked against "Brazilian Wax"
+    for name, addon in addon_index["names"]:
+        if name in service_name_lower or service_name_lower in name:
+            return addon
+
+    # Fall back to the studio's first add-on
+    return addon_index["fallback"]
+
+
+def generate_upsell_sms(client_name: str, service: str, addon: dict, config: dict) -> str | None:
+    """
+    Draft a personalized upsell SMS.
+
+    The LLM writes one template per (studio, service, add-on, voice) with a
+    {first_name} placeholder; templates are cached so a window full of the
+    same service costs one LLM call instead of one per booking. Returns
+    None if the LLM's template can't be personalized.
+    """
+    template = _get_upsell_template(service, addon, config)
+    if template is None:
+        return None
+    return template.replace("{first_name}", client_name)
 
-    return None
 
+def _static_upsell_sms(client_name: str, service: str, addon: dict) -> str:
+    """Plain upsell SMS used when there's no studio config or the LLM is down."""
+    return f"Hey {client_name}! Add a {addon['name']} (${addon['price']:.0f}) to tomorrow's {service}? Reply YES!"
 
-def generate_upsell_sms(client_name: str, service: str, addon: dict, config: dict) -> str:
-    """Use the LLM to draft a personalized upsell SMS."""
-    system_prompt = _build_upsell_prompt(config)
+
+def _get_upsell_template(service: str, addon: dict, config: dict) -> str | None:
+    studio = config["studio"]
+    key_parts = (
+        studio["id"], studio["name"], service,
+        addon["name"], f"{addon['price']:.2f}", str(addon.get("duration_min", "")),
+        addon.get("pitch", ""), orjson.dumps(config["brand_voice"], option=orjson.OPT_SORT_KEYS).decode(),
+    )
+    key = hashlib.blake2b("\x1f".join(key_parts).encode(), digest_size=16).hexdigest()
+
+    template = _upsell_template_cache.get(key)
+    if template is not None:
+        return template
+
+    # Concurrent bookings for the same combo wait for one LLM call
+    with _template_locks[hash(key) % _TEMPLATE_LOCK_STRIPES]:
+        template = _upsell_template_cache.get(key)
+        if template is None:
+            template = _generate_upsell_template(service, addon, config)
+            if "{first_name}" not in template:
+                # Cached, it would go out unpersonalized to every client for a day
+                logger.warning("Rejected upsell template without {first_name} for %s", service)
+                return None
+            _upsell_template_cache.set(key, template)
+    return template
+
+
+def _generate_upsell_template(service: str, addon: dict, config: dict) -> str:
+    """Ask the LLM for an upsell SMS template containing a {first_name} placeholder."""
+    system_prompt = get_cached_prompt(config, "upsell", _build_upsell_prompt)
 
     result = call_llm_json(
         system_prompt=system_prompt,
         user_message=(
-            f"Client: {client_name}\n"
             f"Booked service: {service}\n"
             f"Add-on: {addon['name']} — ${addon['price']:.0f}, {addon['duration_min']} min\n"
             f"Pitch angle: {addon.get('pitch', 'Add this while youre here!')}"
         ),
+        schema=_UPSELL_SCHEMA,
     )
     return result["sms_body"]
 
 
-def process_upsell_window(studio_id: str = ""):
+async def process_upsell_window(studio_id: str = "") -> list[dict]:
     """
     Main scheduled task: find all bookings within the upsell window
     and send an upsell SMS for each.
 
+    Bookings are paged from the DB into a sliding window of at most
+    UPSELL_CONCURRENCY in-flight tasks, so the first SMS goes out after one
+    page fetch and memory stays flat however large the window is.
+
     Returns a list of results for logging / dashboard display.
     """
-    bookings = get_upcoming_bookings_in_window(
-        hours_from_now=UPSELL_LEAD_TIME_HOURS,
-        studio_id=studio_id,
-    )
-    results = []
-
-    # Load config once if we have a studio_id
-    config = get_studio_config(studio_id) if studio_id else None
-
-    for booking in bookings:
-        bid_studio = booking.get("studio_id", studio_id)
-        if not config and bid_studio:
-            config = get_studio_config(bid_studio)
-
-        addon = _find_best_addon(booking["service"], bid_studio or "")
-        if not addon:
-            continue  # No add-ons configured for this studio
-
-        client_name = booking["client_name"].split()[0]  # First name only
+    configs: dict[str, dict | None] = {}
+    addon_indexes: dict[str, dict] = {}
+    pending: set[asyncio.Task] = set()
+    sms_sem = asyncio.Semaphore(_SMS_CONCURRENCY)
+    outcomes: list[tuple[dict, asyncio.Task]] = []
+
+    async for booking in _upcoming_bookings(studio_id):
+        # Load each distinct studio's config + add-on index at most once per run
+        bid_studio = booking.get("studio_id") or studio_id
+        if bid_studio not in addon_indexes:
+            if bid_studio:
+                configs[bid_studio] = await asyncio.to_thread(get_studio_config, bid_studio)
+            addon_indexes[bid_studio] = await asyncio.to_thread(_load_addon_index, bid_studio)
+
+        if len(pending) >= UPSELL_CONCURRENCY:
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+        task = asyncio.create_task(_process_booking(
+            booking, configs.get(bid_studio), addon_indexes[bid_studio], sms_sem, studio_id,
+        ))
+        pending.add(task)
+        outcomes.append((booking, task))
+
+    if pending:
+        await asyncio.wait(pending)
 
-        # Generate SMS
-        if config:
-            sms_body = generate_upsell_sms(client_name, booking["service"], addon, config)
-        else:
-            sms_body = f"Hey {client_name}! Add a {addon['name']} (${addon['price']:.0f}) to tomorrow's {booking['service']}? Reply YES!"
+    results = []
+    for booking, task in outcomes:
+        if task.exception():
+            logger.error("Upsell failed for booking %s", booking["id"], exc_info=task.exception())
+            continue
+        if task.result():
+            results.append(task.result())
+    return results
 
-        # Send SMS (skip if no phone number)
-        if booking.get("client_phone"):
-            sid = send_sms(to=booking["client_phone"], body=sms_body)
-        else:
-            sid = "no_phone"
 
-        log_event(
-            agent="revenue",
-            action="upsell_sent",
-            metadata={
-                "booking_id": booking["id"],
-                "addon": addon["name"],
-                "addon_price": addon["price"],
-                "sms_sid": sid,
-            },
-            studio_id=bid_studio,
-        )
+async def _upcoming_bookings(studio_id: str = ""):
+    """
+    Yield the upsell window's bookings page by page. Each page is a short
+    keyset read in a worker thread, so the run (paced by LLM and SMS calls)
+    never holds a pooled connection or read transaction between pages.
+    """
+    window_start, until = upcoming_booking_window(UPSELL_LEAD_TIME_HOURS)
+    after = (window_start, "")
+    while page := await asyncio.to_thread(get_upcoming_bookings_page, after, until, studio_id):
+        for booking in page:
+            yield booking
+        after = (page[-1]["scheduled_at"], page[-1]["id"])
+
+
+async def _process_booking(
+    booking: dict,
+    config: dict | None,
+    addon_index: dict,
+    sms_sem: asyncio.Semaphore,
+    studio_id: str = "",
+) -> dict | None:
+    """Find an add-on, draft the SMS, send it, and log the upsell for one booking."""
+    bid_studio = booking.get("studio_id") or studio_id
+
+    addon = _find_best_addon(booking["service"], addon_index)
+    if not addon:
+        return None  # No add-ons configured for this studio
+
+    client_name = first_name(booking["client_name"])
+
+    # Generate SMS — fall back to the plain template if the LLM is failing
+    sms_body = None
+    if config:
+        try:
+            sms_body = await asyncio.to_thread(
+                llm_breaker.call, generate_upsell_sms, client_name, booking["service"], addon, config,
+            )
+        except Exception as e:
+            logger.warning("LLM unavailable for booking %s, using template: %s", booking["id"], e)
+    if not sms_body:
+        sms_body = _static_upsell_sms(client_name, booking["service"], addon)
+
+    # Send SMS (skip if no phone number)
+    if booking.get("client_phone"):
+        async with sms_sem:
+            sid = await asyncio.to_thread(
+                send_sms, to=booking["client_phone"], body=sms_body, studio_id=bid_studio or "",
+            )
+    else:
+        sid = "no_phone"
 
-        results.append({
+    log_event(
+        agent="revenue",
+        action="upsell_sent",
+        metadata={
             "booking_id": booking["id"],
-            "client_name": client_name,
-            "service": booking["service"],
-            "addon_offered": addon["name"],
+            "addon": addon["name"],
             "addon_price": addon["price"],
-            "sms_body": sms_body,
             "sms_sid": sid,
-        })
+        },
+        studio_id=bid_studio,
+    )
 
-    return results
+    return {
+        "booking_id": booking["id"],
+        "client_name": client_name,
+        "service": booking["service"],
+        "addon_offered": addon["name"],
+        "addon_price": addon["price"],
+        "sms_body": sms_body,
+        "sms_sid": sid,
+    }
 
 
 def handle_upsell_reply(booking_id: str, reply_text: str, studio_id: str = "") -> dict:
@@ -150,10 +305,8 @@ def handle_upsell_reply(booking_id: str, reply_text: str, studio_id: str = "") -
     Handle an inbound SMS reply to an upsell.
     If the reply is affirmative, add the upsell to the booking.
     """
-    affirmative = reply_text.strip().lower() in (
-        "yes", "yep", "yeah", "y", "sure", "ok", "add it", "do it",
-        "yes please", "yes!", "yesss",
-    )
+    normalized = reply_text.strip().lower()
+    affirmative = normalized in _AFFIRMATIVE_REPLIES
 
     if affirmative:
         # In production, look up what was offered from event metadata
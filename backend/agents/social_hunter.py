@@ -16,17 +16,49 @@ Output Schema (per post/review evaluation):
 }
 """
 
-from backend.services.llm import call_llm_json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import orjson
+
+from backend.services import llm_cache
+from backend.services.llm import call_llm_json, LLMError
 from backend.services.reddit import search_subreddits, reply_to_post
 from backend.services.google_maps import get_negative_reviews, geocode_location
 from backend.database import (
-    save_social_lead,
-    is_post_already_seen,
+    save_social_leads_bulk,
+    seen_post_ids,
+    get_cached_geocode,
+    get_scan_cursors,
+    save_scan_cursors,
+    save_geocode,
     get_social_lead_by_id,
     update_social_lead_status,
     log_event,
 )
-from backend.studio_config import get_studio_config, get_services_menu
+from backend.studio_config import get_studio_config, get_services_menu, get_cached_prompt
+from config.settings import SOCIAL_HUNTER_LLM_WORKERS, LLM_FAST_MODEL
+
+logger = logging.getLogger(__name__)
+
+# How long a cached LLM verdict stays valid. A post's intent doesn't change;
+# reviews are re-checked daily.
+_POST_EVAL_CACHE_TTL = 7 * 86400
+_REVIEW_EVAL_CACHE_TTL = 86400
+
+_STUDIO_WORKERS = 16  # studios scanned in parallel by the scheduled runner
+
+_GEOCODE_CACHE_TTL = 30 * 86400  # studio locations almost never move
+
+_CURSOR_OVERLAP_SEC = 3600  # re-check the last hour before each cursor
+
+# Post/review body lengths: stored on leads, sent to the drafting model,
+# and kept on dismissed rows
+_BODY_STORE_CHARS = 2000
+_BODY_PROMPT_CHARS = 1000
+_BODY_SHORT_CHARS = 500
 
 
 # ── Default Keywords ────────────────────────────────────────────────
@@ -45,91 +77,131 @@ DEFAULT_KEYWORDS = [
 
 
 # ── Prompt Builder ──────────────────────────────────────────────────
+#
+# Evaluation runs in two stages: a fast model classifies every post/review,
+# and the full model drafts a reply only for the matches.
+#
+# Prompts are lists of system blocks, each cacheable on its own:
+# [instructions + JSON schema, services menu, studio identity]. The first
+# block never interpolates studio data, so every scan (for every studio)
+# shares it; the menu block only changes when the studio edits its menu.
 
-def _build_evaluation_prompt(config: dict) -> str:
-    """Build the Social Hunter evaluation prompt from studio config."""
-    studio = config["studio"]
-    voice = config["brand_voice"]
-    services_menu = get_services_menu(config)
-
-    return f"""You are the Social Hunter AI for "{studio['name']}".
+_POST_EVALUATION_INSTRUCTIONS = """You are the Social Hunter AI for the beauty studio described in STUDIO SERVICES and STUDIO PROFILE below.
 
 Your job is to evaluate social media posts to determine if the person is looking
-for beauty services that {studio['name']} offers, and if so, draft a helpful reply.
-
-STUDIO SERVICES:
-{services_menu}
-
-STUDIO PERSONALITY:
-{voice['personality']}
+for beauty services that the studio offers.
 
 EVALUATION CRITERIA:
 1. Is the person asking for or looking for a beauty service that this studio offers?
 2. Do they seem to be in or near the studio's area? (If location is unclear, give benefit of the doubt.)
-3. Is this a genuine recommendation request (not spam, ads, or self-promotion)?
+3. Is this a genuine recommendation request (not spam, ads, or self-promotion)?"""
+
+
+_POST_REPLY_INSTRUCTIONS = """You are the Social Hunter AI for the beauty studio described in STUDIO SERVICES and STUDIO PROFILE below.
+
+The social media post you are given is from someone looking for a service the studio
+offers. Draft a helpful reply.
 
 IMPORTANT RULES FOR THE DRAFTED REPLY:
 - Be genuinely helpful FIRST. Answer their question, give useful advice.
 - Mention the studio naturally as a recommendation, NOT as a hard sell.
 - Do NOT sound like an ad or bot. Sound like a real person who happens to know a great place.
 - Keep it concise (2-4 sentences max).
-- Include the studio name: "{studio['name']}"
-- If the studio has a booking URL, you may include it naturally: {studio.get('booking_url', '')}
-- Match the studio's tone: {voice['personality'][:100]}
-
-RESPOND WITH VALID JSON ONLY:
-{{
-    "is_relevant": true/false,
-    "match_score": 0.0-1.0,
-    "reasoning": "Brief explanation of why this post is or isn't a match",
-    "drafted_reply": "The Reddit comment to post (only if is_relevant is true, otherwise empty string)"
-}}
+- Include the studio name exactly as given in the profile.
+- If the studio has a booking URL, you may include it naturally.
+- Match the studio's tone (see STUDIO PERSONALITY)."""
 
-If is_relevant is false, set match_score to the relevance level anyway (for analytics)
-and drafted_reply to an empty string."""
 
-
-def _build_review_evaluation_prompt(config: dict) -> str:
-    """Build the Social Hunter evaluation prompt for Google Maps negative reviews."""
-    studio = config["studio"]
-    voice = config["brand_voice"]
-    services_menu = get_services_menu(config)
-
-    return f"""You are the Social Hunter AI for "{studio['name']}".
+_REVIEW_EVALUATION_INSTRUCTIONS = """You are the Social Hunter AI for the beauty studio described in STUDIO SERVICES and STUDIO PROFILE below.
 
 Your job is to evaluate NEGATIVE REVIEWS of competing beauty businesses to determine
 if the reviewer is likely looking for a new provider and could be a potential client.
 
-STUDIO SERVICES:
-{services_menu}
-
 EVALUATION CRITERIA:
 1. Does the review indicate the person is unhappy enough to switch providers?
-2. Is the complaint about a service that {studio['name']} offers?
-3. Does the review mention specific issues that {studio['name']} could solve
+2. Is the complaint about a service that the studio offers?
+3. Does the review mention specific issues that the studio could solve
    (e.g., poor quality, rudeness, long waits, cancellation issues)?
-4. Is this a recent review from a real person (not a fake/spam review)?
+4. Is this a recent review from a real person (not a fake/spam review)?"""
+
+
+_REVIEW_REPLY_INSTRUCTIONS = """You are the Social Hunter AI for the beauty studio described in STUDIO SERVICES and STUDIO PROFILE below.
+
+The negative review you are given is from someone likely looking for a new provider.
+Draft an outreach template for the studio owner.
 
 IMPORTANT RULES FOR THE OUTREACH TEMPLATE:
 - Draft a SHORT, empathetic outreach message (2-3 sentences max).
 - Do NOT mention you read their negative review — that feels creepy.
 - Instead, position as a friendly local recommendation or introduction.
-- Mention {studio['name']} naturally and what makes it different.
-- Include booking URL if available: {studio.get('booking_url', '')}
-- Match the studio's tone: {voice['personality'][:100]}
+- Mention the studio by name naturally and what makes it different.
+- Include the booking URL if available.
+- Match the studio's tone (see STUDIO PERSONALITY).
 - This message is for the studio owner to adapt and send themselves
-  (via DM, comment, or local community). It is NOT auto-posted.
+  (via DM, comment, or local community). It is NOT auto-posted."""
+
+
+# Passed as structured-output schemas, so the prompts above don't spell out
+# the JSON format; field guidance lives in the descriptions.
+_EVALUATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "is_relevant": {"type": "boolean"},
+        "match_score": {
+            "type": "number",
+            "description": "Relevance from 0.0 to 1.0; set it even when is_relevant is false (for analytics).",
+        },
+        "reasoning": {"type": "string", "description": "Brief explanation of why this is or isn't a match."},
+    },
+    "required": ["is_relevant", "match_score", "reasoning"],
+}
 
-RESPOND WITH VALID JSON ONLY:
-{{
-    "is_relevant": true/false,
-    "match_score": 0.0-1.0,
-    "reasoning": "Brief explanation of why this reviewer is or isn't a potential client",
-    "drafted_reply": "Outreach template for the studio owner (only if is_relevant, otherwise empty string)"
-}}
+_REPLY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "drafted_reply": {"type": "string", "description": "The reply or outreach message to send."},
+    },
+    "required": ["drafted_reply"],
+}
 
-If is_relevant is false, set match_score to the relevance level anyway (for analytics)
-and drafted_reply to an empty string."""
+
+def _build_studio_blocks(config: dict, include_voice: bool = True) -> list[str]:
+    """
+    Studio-specific system blocks appended after the shared instructions:
+    the services menu (changes only when the menu is edited) followed by
+    the studio's identity.
+    """
+    studio = config["studio"]
+    services = f"STUDIO SERVICES:\n{get_services_menu(config)}"
+
+    identity = f"STUDIO PROFILE:\nName: {studio['name']}"
+    if include_voice:
+        identity += f"""
+Booking URL: {studio.get('booking_url', '') or '(none)'}
+
+STUDIO PERSONALITY:
+{config['brand_voice']['personality']}"""
+    return [services, identity]
+
+
+def _build_evaluation_prompt(config: dict) -> list[str]:
+    """Build the Social Hunter relevance prompt (stage 1) from studio config."""
+    return [_POST_EVALUATION_INSTRUCTIONS, *_build_studio_blocks(config, include_voice=False)]
+
+
+def _build_reply_prompt(config: dict) -> list[str]:
+    """Build the Social Hunter reply-drafting prompt (stage 2) from studio config."""
+    return [_POST_REPLY_INSTRUCTIONS, *_build_studio_blocks(config)]
+
+
+def _build_review_evaluation_prompt(config: dict) -> list[str]:
+    """Build the relevance prompt (stage 1) for Google Maps negative reviews."""
+    return [_REVIEW_EVALUATION_INSTRUCTIONS, *_build_studio_blocks(config, include_voice=False)]
+
+
+def _build_review_reply_prompt(config: dict) -> list[str]:
+    """Build the outreach-drafting prompt (stage 2) for Google Maps negative reviews."""
+    return [_REVIEW_REPLY_INSTRUCTIONS, *_build_studio_blocks(config)]
 
 
 # ── Agent Logic ─────────────────────────────────────────────────────
@@ -159,9 +231,11 @@ def run_social_hunter(
     if not config:
         return {"error": "Studio not found", "studio_id": studio_id}
 
-    # Determine subreddits and keywords
+    # Determine subreddits and keywords. Scans with the studio's own keywords
+    # resume from per-subreddit cursors; ad-hoc keyword scans search the full window.
     if not subreddits:
         subreddits = _get_studio_subreddits(config["studio"])
+    incremental = not keywords
     if not keywords:
         keywords = _get_studio_keywords(config)
 
@@ -174,12 +248,32 @@ def run_social_hunter(
         )
         return {"error": "No subreddits configured for this studio."}
 
+    # With no menu every post would be judged irrelevant; don't pay the LLM to say so
+    if not config["services"]:
+        log_event(
+            agent="social_hunter",
+            action="scan_skipped",
+            metadata={"reason": "No services configured"},
+            studio_id=studio_id,
+        )
+        return {"error": "No services configured for this studio."}
+
     # Step 1: Search Reddit
+    after_utc = None
+    complete: set[str] = set()
+    if incremental:
+        # Overlap by a margin: Reddit's search index lags behind new posts
+        after_utc = {
+            sub: last_utc - _CURSOR_OVERLAP_SEC
+            for sub, last_utc in get_scan_cursors(studio_id).items()
+        }
     raw_posts = search_subreddits(
         subreddits=subreddits,
         keywords=keywords,
         limit=limit_per_search,
         time_filter="week",
+        after_utc=after_utc,
+        complete=complete,
     )
 
     log_event(
@@ -194,12 +288,12 @@ def run_social_hunter(
     )
 
     # Step 2: Filter out already-seen posts
-    new_posts = []
-    for post in raw_posts:
-        if not is_post_already_seen(studio_id, post["fullname"]):
-            new_posts.append(post)
+    seen = seen_post_ids(studio_id, [p["fullname"] for p in raw_posts])
+    new_posts = [p for p in raw_posts if p["fullname"] not in seen]
 
     if not new_posts:
+        if incremental:
+            _advance_scan_cursors(studio_id, raw_posts, complete)
         log_event(
             agent="social_hunter",
             action="scan_complete",
@@ -212,40 +306,68 @@ def run_social_hunter(
             "leads_saved": 0,
         }
 
-    # Step 3: Evaluate each post with LLM
-    system_prompt = _build_evaluation_prompt(config)
+    # Step 3: Evaluate posts with LLM (concurrently; DB writes stay on this thread)
     leads_saved = 0
     leads_relevant = 0
 
+    # Truncate each body once for storage, the drafting prompt and dismissed rows
     for post in new_posts:
-        try:
-            result = call_llm_json(
-                system_prompt=system_prompt,
-                user_message=(
-                    f"Subreddit: r/{post['subreddit']}\n"
-                    f"Title: {post['title']}\n"
-                    f"Body: {post['selftext'][:1000]}\n"
-                    f"Author: u/{post['author']}\n"
-                    f"Score: {post['score']} upvotes, {post['num_comments']} comments"
-                ),
-            )
-        except Exception as e:
-            print(f"[Social Hunter] LLM error for post {post['id']}: {e}")
+        post["selftext"] = post["selftext"][:_BODY_STORE_CHARS]
+        post["selftext_prompt"] = post["selftext"][:_BODY_PROMPT_CHARS]
+        post["selftext_short"] = post["selftext_prompt"][:_BODY_SHORT_CHARS]
+
+    # Reposts and crossposts share one evaluation with their first occurrence
+    representatives = _group_near_duplicates(new_posts)
+    unique = sorted(set(representatives))
+
+    # Posts that mention none of the studio's keywords are dismissed without an LLM call.
+    # The dismissal is permanent, so match the whole stored body, not the short excerpt.
+    pattern = _keyword_pattern(tuple(keywords))
+    candidates = [
+        i for i in unique
+        if pattern.search(new_posts[i]["title"]) or pattern.search(new_posts[i]["selftext"])
+    ]
+
+    # The classifier only needs intent, so it sees a compressed body;
+    # drafting gets the full text.
+    results = _evaluate_concurrently(
+        get_cached_prompt(config, "social_hunter_post_eval", _build_evaluation_prompt), studio_id, _POST_EVAL_CACHE_TTL,
+        [_post_message(new_posts[i], _compress_text(new_posts[i]["selftext"])) for i in candidates],
+        _EVALUATION_SCHEMA,
+        model=LLM_FAST_MODEL,
+    )
+    messages = [_post_message(new_posts[i], new_posts[i]["selftext_prompt"]) for i in candidates]
+    results = _draft_for_matches(
+        get_cached_prompt(config, "social_hunter_post_reply", _build_reply_prompt), studio_id, _POST_EVAL_CACHE_TTL, messages, results,
+    )
+    by_representative = dict.fromkeys(unique, _NO_KEYWORD_MATCH)
+    by_representative.update(zip(candidates, results))
+    evaluations = [by_representative[rep] for rep in representatives]
+
+    # Leads are written in one batch after the loop; `found` remembers which
+    # ones need a lead_found event once their ids exist.
+    pending_leads: list[dict] = []
+    found: list[tuple[int, dict]] = []
+
+    for post, result in zip(new_posts, evaluations):
+        if isinstance(result, Exception):
+            e = result
+            logger.error("LLM error for post %s: %s", post["id"], e, exc_info=e)
             # Save as dismissed so we don't re-process it
-            save_social_lead(
+            pending_leads.append(dict(
                 studio_id=studio_id,
                 platform="reddit",
                 post_id=post["fullname"],
                 post_url=post["url"],
                 post_title=post["title"],
-                post_body=post["selftext"][:2000],
+                post_body=post["selftext"],
                 subreddit=post["subreddit"],
                 author=post["author"],
                 match_score=0.0,
                 match_reasoning=f"LLM evaluation failed: {e}",
                 drafted_reply="",
                 status="dismissed",
-            )
+            ))
             continue
 
         is_relevant = result.get("is_relevant", False)
@@ -253,50 +375,47 @@ def run_social_hunter(
 
         if is_relevant and match_score >= 0.5:
             leads_relevant += 1
-            lead_id = save_social_lead(
+            found.append((len(pending_leads), {
+                "post_url": post["url"],
+                "subreddit": post["subreddit"],
+                "match_score": match_score,
+                "dry_run": dry_run,
+            }))
+            pending_leads.append(dict(
                 studio_id=studio_id,
                 platform="reddit",
                 post_id=post["fullname"],
                 post_url=post["url"],
                 post_title=post["title"],
-                post_body=post["selftext"][:2000],
+                post_body=post["selftext"],
                 subreddit=post["subreddit"],
                 author=post["author"],
                 match_score=match_score,
                 match_reasoning=result.get("reasoning", ""),
                 drafted_reply=result.get("drafted_reply", ""),
                 status="new",
-            )
+            ))
             leads_saved += 1
-
-            log_event(
-                agent="social_hunter",
-                action="lead_found",
-                metadata={
-                    "lead_id": lead_id,
-                    "post_url": post["url"],
-                    "subreddit": post["subreddit"],
-                    "match_score": match_score,
-                    "dry_run": dry_run,
-                },
-                studio_id=studio_id,
-            )
         else:
             # Save as dismissed so we don't re-scan this post
-            save_social_lead(
+            pending_leads.append(dict(
                 studio_id=studio_id,
                 platform="reddit",
                 post_id=post["fullname"],
                 post_url=post["url"],
                 post_title=post["title"],
-                post_body=post["selftext"][:500],
+                post_body=post["selftext_short"],
                 subreddit=post["subreddit"],
                 author=post["author"],
                 match_score=match_score,
                 match_reasoning=result.get("reasoning", ""),
                 drafted_reply="",
                 status="dismissed",
-            )
+            ))
+
+    _save_leads_and_log(pending_leads, found, studio_id)
+    if incremental:
+        _advance_scan_cursors(studio_id, raw_posts, complete)
 
     log_event(
         agent="social_hunter",
@@ -433,8 +552,17 @@ def run_google_maps_hunter(
         )
         return {"error": "No location configured. Set a zip code or city in studio settings."}
 
+    if not config["services"]:
+        log_event(
+            agent="social_hunter",
+            action="gmaps_scan_skipped",
+            metadata={"reason": "No services configured"},
+            studio_id=studio_id,
+        )
+        return {"error": "No services configured for this studio."}
+
     # Geocode the location
-    coords = geocode_location(location)
+    coords = _geocode_cached(location)
     if not coords:
         log_event(
             agent="social_hunter",
@@ -465,10 +593,8 @@ def run_google_maps_hunter(
     )
 
     # Filter out already-seen reviews
-    new_reviews = []
-    for review in raw_reviews:
-        if not is_post_already_seen(studio_id, review["review_id"]):
-            new_reviews.append(review)
+    seen = seen_post_ids(studio_id, [r["review_id"] for r in raw_reviews])
+    new_reviews = [r for r in raw_reviews if r["review_id"] not in seen]
 
     if not new_reviews:
         log_event(
@@ -483,40 +609,48 @@ def run_google_maps_hunter(
             "leads_saved": 0,
         }
 
-    # Evaluate each review with LLM
-    system_prompt = _build_review_evaluation_prompt(config)
+    # Evaluate reviews with LLM (concurrently; DB writes stay on this thread)
     leads_saved = 0
     leads_relevant = 0
 
+    # Truncate each review once for storage, the drafting prompt and dismissed rows
     for review in new_reviews:
-        try:
-            result = call_llm_json(
-                system_prompt=system_prompt,
-                user_message=(
-                    f"Business: {review['place_name']}\n"
-                    f"Location: {review['place_address']}\n"
-                    f"Reviewer: {review['author']}\n"
-                    f"Rating: {review['rating']} star(s)\n"
-                    f"Review: {review['text'][:1000]}\n"
-                    f"Posted: {review['relative_time']}"
-                ),
-            )
-        except Exception as e:
-            print(f"[Social Hunter] LLM error for review {review['review_id']}: {e}")
-            save_social_lead(
+        review["text"] = review["text"][:_BODY_STORE_CHARS]
+        review["text_prompt"] = review["text"][:_BODY_PROMPT_CHARS]
+        review["text_short"] = review["text_prompt"][:_BODY_SHORT_CHARS]
+
+    evaluations = _evaluate_concurrently(
+        get_cached_prompt(config, "social_hunter_review_eval", _build_review_evaluation_prompt), studio_id, _REVIEW_EVAL_CACHE_TTL,
+        [_review_message(review, _compress_text(review["text"])) for review in new_reviews],
+        _EVALUATION_SCHEMA,
+        model=LLM_FAST_MODEL,
+    )
+    messages = [_review_message(review, review["text_prompt"]) for review in new_reviews]
+    evaluations = _draft_for_matches(
+        get_cached_prompt(config, "social_hunter_review_reply", _build_review_reply_prompt), studio_id, _REVIEW_EVAL_CACHE_TTL, messages, evaluations,
+    )
+
+    pending_leads: list[dict] = []
+    found: list[tuple[int, dict]] = []
+
+    for review, result in zip(new_reviews, evaluations):
+        if isinstance(result, Exception):
+            e = result
+            logger.error("LLM error for review %s: %s", review["review_id"], e, exc_info=e)
+            pending_leads.append(dict(
                 studio_id=studio_id,
                 platform="google_maps",
                 post_id=review["review_id"],
                 post_url="",
                 post_title=f"{review['rating']}-star review of {review['place_name']}",
-                post_body=review["text"][:2000],
+                post_body=review["text"],
                 subreddit=review["place_name"],
                 author=review["author"],
                 match_score=0.0,
                 match_reasoning=f"LLM evaluation failed: {e}",
                 drafted_reply="",
                 status="dismissed",
-            )
+            ))
             continue
 
         is_relevant = result.get("is_relevant", False)
@@ -524,49 +658,44 @@ def run_google_maps_hunter(
 
         if is_relevant and match_score >= 0.5:
             leads_relevant += 1
-            lead_id = save_social_lead(
+            found.append((len(pending_leads), {
+                "platform": "google_maps",
+                "place_name": review["place_name"],
+                "match_score": match_score,
+                "review_rating": review["rating"],
+            }))
+            pending_leads.append(dict(
                 studio_id=studio_id,
                 platform="google_maps",
                 post_id=review["review_id"],
                 post_url="",
                 post_title=f"{review['rating']}-star review of {review['place_name']}",
-                post_body=review["text"][:2000],
+                post_body=review["text"],
                 subreddit=review["place_name"],
                 author=review["author"],
                 match_score=match_score,
                 match_reasoning=result.get("reasoning", ""),
                 drafted_reply=result.get("drafted_reply", ""),
                 status="new",
-            )
+            ))
             leads_saved += 1
-
-            log_event(
-                agent="social_hunter",
-                action="lead_found",
-                metadata={
-                    "lead_id": lead_id,
-                    "platform": "google_maps",
-                    "place_name": review["place_name"],
-                    "match_score": match_score,
-                    "review_rating": review["rating"],
-                },
-                studio_id=studio_id,
-            )
         else:
-            save_social_lead(
+            pending_leads.append(dict(
                 studio_id=studio_id,
                 platform="google_maps",
                 post_id=review["review_id"],
                 post_url="",
                 post_title=f"{review['rating']}-star review of {review['place_name']}",
-                post_body=review["text"][:500],
+                post_body=review["text_short"],
                 subreddit=review["place_name"],
                 author=review["author"],
                 match_score=match_score,
                 match_reasoning=result.get("reasoning", ""),
                 drafted_reply="",
                 status="dismissed",
-            )
+            ))
+
+    _save_leads_and_log(pending_leads, found, studio_id)
 
     log_event(
         agent="social_hunter",
@@ -588,18 +717,252 @@ def run_google_maps_hunter(
     }
 
 
+def _advance_scan_cursors(studio_id: str, raw_posts: list[dict], complete: set[str]):
+    """
+    Record the newest post seen per subreddit once the scan's leads are saved.
+    Subreddits whose search failed or hit its limit keep their old cursor, so
+    the posts it didn't reach are picked up next scan.
+    """
+    newest: dict[str, int] = {}
+    for post in raw_posts:
+        if post["subreddit"] not in complete:
+            continue
+        created = int(post["created_utc"])
+        if created > newest.get(post["subreddit"], 0):
+            newest[post["subreddit"]] = created
+    if newest:
+        save_scan_cursors(studio_id, newest)
+
+
+def _save_leads_and_log(pending_leads: list[dict], found: list[tuple[int, dict]], studio_id: str):
+    """Insert a scan's leads in one transaction, then log lead_found for the matches."""
+    lead_ids = save_social_leads_bulk(pending_leads)
+    for index, metadata in found:
+        log_event(
+            agent="social_hunter",
+            action="lead_found",
+            metadata={"lead_id": lead_ids[index], **metadata},
+            studio_id=studio_id,
+        )
+
+
+# ── LLM Helpers ─────────────────────────────────────────────────────
+
+_URL_RE = re.compile(r"https?://\S+")
+_WHITESPACE_RE = re.compile(r"\s+")
+_QUESTION_RE = re.compile(r"[^.!?]*\?")
+
+
+def _compress_text(text: str, head: int = 300, tail: int = 200) -> str:
+    """
+    Cheap prompt compression for relevance scoring: drop URLs, collapse
+    whitespace, and keep the first `head` + last `tail` characters, plus
+    the first question if it falls in the cut middle.
+    """
+    text = _WHITESPACE_RE.sub(" ", _URL_RE.sub("", text)).strip()
+    if len(text) <= head + tail:
+        return text
+
+    kept = text[:head]
+    question = _QUESTION_RE.search(text, head, len(text) - tail)
+    if question:
+        kept += " … " + question.group().strip()
+    return kept + " … " + text[-tail:]
+
+
+_POST_MESSAGE_TEMPLATE = (
+    "Subreddit: r/{subreddit}\n"
+    "Title: {title}\n"
+    "Body: {body}\n"
+    "Author: u/{author}\n"
+    "Score: {score} upvotes, {num_comments} comments"
+)
+
+_REVIEW_MESSAGE_TEMPLATE = (
+    "Business: {place_name}\n"
+    "Location: {place_address}\n"
+    "Reviewer: {author}\n"
+    "Rating: {rating} star(s)\n"
+    "Review: {body}\n"
+    "Posted: {relative_time}"
+)
+
+
+def _post_message(post: dict, body: str) -> str:
+    return _POST_MESSAGE_TEMPLATE.format_map({**post, "body": body})
+
+
+def _review_message(review: dict, text: str) -> str:
+    return _REVIEW_MESSAGE_TEMPLATE.format_map({**review, "body": text})
+
+
+def _evaluate_concurrently(
+    system_prompt: str | list[str],
+    studio_id: str,
+    cache_ttl: int,
+    user_messages: list[str],
+    schema: dict,
+    model: str = "",
+) -> list[dict | Exception]:
+    """
+    Run `call_llm_json` for every message on a thread pool, serving exact
+    repeats (same model + prompt + message) from the LLM response cache.
+    Returns results in input order; a failed call yields its exception, so
+    one bad post never aborts the scan.
+    """
+    def _evaluate(user_message: str) -> dict | Exception:
+        try:
+            result = llm_cache.get_or_compute(
+                llm_cache.make_key(system_prompt, user_message, model),
+                lambda: call_llm_json(
+                    system_prompt=system_prompt,
+                    user_message=user_message,
+                    cache_key=f"social_hunter:{studio_id}",
+                    model=model,
+                    schema=schema,
+                ),
+                ttl=cache_ttl,
+            )
+            if not isinstance(result, dict):
+                raise TypeError(f"expected a JSON object, got {type(result).__name__}")
+            return result
+        except LLMError as e:
+            return e  # provider failure, already retried; callers log it per post
+        except Exception as e:
+            logger.exception("Evaluation failed for a post in studio %s", studio_id)
+            return e
+
+    if not user_messages:
+        return []
+    with ThreadPoolExecutor(max_workers=min(SOCIAL_HUNTER_LLM_WORKERS, len(user_messages))) as ex:
+        return list(ex.map(_evaluate, user_messages))
+
+
+def _is_match(result: dict | Exception) -> bool:
+    return (
+        isinstance(result, dict)
+        and result.get("is_relevant", False)
+        and result.get("match_score", 0.0) >= 0.5
+    )
+
+
+def _draft_for_matches(
+    system_prompt: str | list[str],
+    studio_id: str,
+    cache_ttl: int,
+    user_messages: list[str],
+    evaluations: list[dict | Exception],
+) -> list[dict | Exception]:
+    """
+    Stage 2: draft replies with the full model, only for evaluations that
+    matched. A failed draft replaces the evaluation with its exception.
+    """
+    matches = [i for i, result in enumerate(evaluations) if _is_match(result)]
+    drafts = _evaluate_concurrently(
+        system_prompt, studio_id, cache_ttl, [user_messages[i] for i in matches], _REPLY_SCHEMA,
+    )
+
+    evaluations = list(evaluations)
+    for i, draft in zip(matches, drafts):
+        if isinstance(draft, Exception):
+            evaluations[i] = draft
+        else:
+            evaluations[i] = {**evaluations[i], "drafted_reply": draft.get("drafted_reply", "")}
+    return evaluations
+
+
+_NEAR_DUPLICATE_THRESHOLD = 0.8  # Jaccard similarity of word trigrams
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def _shingles(text: str) -> set[str]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < 3:
+        return set(words)
+    return {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def _group_near_duplicates(posts: list[dict]) -> list[int]:
+    """
+    For each post, return the index of the first earlier post whose
+    title + body is a near-duplicate of it (or its own index if none).
+    """
+    seen: list[tuple[int, set[str]]] = []
+    representatives = []
+    for i, post in enumerate(posts):
+        shingles = _shingles(f"{post['title']} {post['selftext']}")
+        for j, other in seen:
+            if shingles and other and len(shingles & other) / len(shingles | other) >= _NEAR_DUPLICATE_THRESHOLD:
+                representatives.append(j)
+                break
+        else:
+            seen.append((i, shingles))
+            representatives.append(i)
+    return representatives
+
+
+# ── Keyword Pre-filter ──────────────────────────────────────────────
+
+_NO_KEYWORD_MATCH = {
+    "is_relevant": False,
+    "match_score": 0.0,
+    "reasoning": "Skipped: post mentions none of the studio's keywords.",
+}
+
+# Filler words in search phrases that say nothing about the service
+_KEYWORD_STOPWORDS = frozenset({
+    "recommendation", "recommend", "looking", "need", "who", "does", "for", "a",
+})
+
+
+@lru_cache(maxsize=1024)
+def _keyword_pattern(keywords: tuple[str, ...]) -> re.Pattern:
+    """
+    One compiled regex matching any content word of any keyword. Words
+    match anywhere, so "lash" also catches "eyelash" and "wax" catches
+    "waxing" — a false hit only costs the LLM call we'd have made anyway.
+    """
+    terms = {
+        word
+        for keyword in keywords
+        for word in keyword.lower().split()
+        if word not in _KEYWORD_STOPWORDS
+    }
+    # A term containing a shorter term can never add a match ("waxing" vs "wax")
+    terms = frozenset(t for t in terms if not any(o != t and o in t for o in terms))
+    return _compile_terms(terms)
+
+
+@lru_cache(maxsize=256)
+def _compile_terms(terms: frozenset[str]) -> re.Pattern:
+    # Keyed on the reduced term set, so studios whose menus expand to the
+    # same words share one compiled pattern across a scheduled run.
+    return re.compile("|".join(map(re.escape, sorted(terms))), re.IGNORECASE)
+
+
 # ── Config Helpers ──────────────────────────────────────────────────
 
+def _geocode_cached(location: str) -> dict | None:
+    """Geocode a studio location, reusing coordinates stored in the last 30 days."""
+    key = location.strip().lower()
+    coords = get_cached_geocode(key, max_age_sec=_GEOCODE_CACHE_TTL)
+    if coords:
+        return coords
+    coords = geocode_location(location)
+    if coords:
+        save_geocode(key, coords["lat"], coords["lng"])
+    return coords
+
+
 def _get_studio_subreddits(studio: dict) -> list[str]:
     """
     Get the subreddit list for a studio.
     For MVP: returns empty (must be passed via API).
     Future: stored in studio config column.
     """
-    import json
     raw = studio.get("target_subreddits", "[]")
     try:
-        subs = json.loads(raw) if isinstance(raw, str) else raw
+        subs = orjson.loads(raw) if isinstance(raw, str) else raw
         return subs if subs else []
     except Exception:
         return []
@@ -610,16 +973,20 @@ def _get_studio_keywords(config: dict) -> list[str]:
     Build keyword list from the studio's services + defaults.
     E.g., if they offer "Brazilian Wax", keywords include "brazilian wax", "waxing", etc.
     """
-    keywords = list(DEFAULT_KEYWORDS)
-    for svc in config.get("services", []):
-        svc_name = svc["name"].lower()
-        if svc_name not in keywords:
-            keywords.append(svc_name)
+    service_names = tuple(svc["name"] for svc in config.get("services", []))
+    return list(_keywords_for_services(service_names))
+
+
+@lru_cache(maxsize=1024)
+def _keywords_for_services(service_names: tuple[str, ...]) -> tuple[str, ...]:
+    # A dict keeps first-seen order while deduplicating in O(1) per word
+    keywords = dict.fromkeys(DEFAULT_KEYWORDS)
+    for name in service_names:
+        svc_name = name.lower()
+        keywords[svc_name] = None
         # Also add individual words for broader matching
-        for word in svc_name.split():
-            if len(word) > 3 and word not in keywords:
-                keywords.append(word)
-    return keywords
+        keywords.update(dict.fromkeys(w for w in svc_name.split() if len(w) > 3))
+    return tuple(keywords)
 
 
 # ── Scheduled Runner ────────────────────────────────────────────────
@@ -637,24 +1004,34 @@ def run_social_hunter_all_studios():
             "SELECT id FROM studios WHERE onboarding_complete=1"
         ).fetchall()
 
+    if not rows:
+        return []
+
+    # Studios are independent; the global LLM semaphore in the LLM service
+    # keeps the combined fan-out under the provider's rate limit.
+    with ThreadPoolExecutor(max_workers=min(_STUDIO_WORKERS, len(rows))) as ex:
+        per_studio = ex.map(_scan_one_studio, [row["id"] for row in rows])
+        return [result for results in per_studio for result in results]
+
+
+def _scan_one_studio(studio_id: str) -> list[dict]:
+    """Run the Reddit and Google Maps scans for one studio."""
     results = []
-    for row in rows:
-        studio_id = row["id"]
 
-        # Reddit scan
-        try:
-            result = run_social_hunter(studio_id=studio_id, dry_run=True)
-            results.append({"studio_id": studio_id, "source": "reddit", **result})
-        except Exception as e:
-            print(f"[Social Hunter] Reddit error for studio {studio_id}: {e}")
-            results.append({"studio_id": studio_id, "source": "reddit", "error": str(e)})
+    # Reddit scan
+    try:
+        result = run_social_hunter(studio_id=studio_id, dry_run=True)
+        results.append({"studio_id": studio_id, "source": "reddit", **result})
+    except Exception as e:
+        logger.exception("Reddit error for studio %s", studio_id)
+        results.append({"studio_id": studio_id, "source": "reddit", "error": str(e)})
 
-        # Google Maps scan
-        try:
-            gmaps_result = run_google_maps_hunter(studio_id=studio_id)
-            results.append({"studio_id": studio_id, "source": "google_maps", **gmaps_result})
-        except Exception as e:
-            print(f"[Social Hunter] Google Maps error for studio {studio_id}: {e}")
-            results.append({"studio_id": studio_id, "source": "google_maps", "error": str(e)})
+    # Google Maps scan
+    try:
+        gmaps_result = run_google_maps_hunter(studio_id=studio_id)
+        results.append({"studio_id": studio_id, "source": "google_maps", **gmaps_result})
+    except Exception as e:
+        logger.exception("Google Maps error for studio %s", studio_id)
+        results.append({"studio_id": studio_id, "source": "google_maps", "error": str(e)})
 
     return results
@@ -15,6 +15,7 @@ Output Schema:
 }
 """
 
+from backend.services import llm_cache
 from backend.services.llm import call_llm_json
 from backend.database import (
     create_client,
@@ -25,8 +26,41 @@ from backend.studio_config import (
     get_studio_config,
     get_services_menu,
     get_policies_text,
+    get_cached_prompt,
 )
 
+# Identical DMs/replies to the same studio prompt reuse the last evaluation
+_DM_EVAL_CACHE_TTL = 3600
+
+# Structured-output schemas; the prompts describe the fields, not the JSON format
+_VIBE_CHECK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "is_approved": {"type": "boolean"},
+        "vibe_score": {"type": "number", "description": "Brand fit from 0.0 (total mismatch) to 1.0 (dream client)."},
+        "reasoning": {"type": "string", "description": "Brief internal note on why you scored them this way."},
+        "draft_reply": {"type": "string", "description": "The actual message to send back to the client."},
+        "requires_policy_confirmation": {"type": "boolean"},
+        "detected_intent": {
+            "type": "string",
+            "enum": ["service_inquiry", "pricing", "policy_bypass", "spam", "other"],
+        },
+    },
+    "required": [
+        "is_approved", "vibe_score", "reasoning", "draft_reply",
+        "requires_policy_confirmation", "detected_intent",
+    ],
+}
+
+_CONFIRMATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "confirmed": {"type": "boolean"},
+        "draft_reply": {"type": "string", "description": "Your response to the client."},
+    },
+    "required": ["confirmed", "draft_reply"],
+}
+
 
 # ── Dynamic Prompt Builders ──────────────────────────────────────────
 
@@ -60,16 +94,6 @@ YOUR JOB:
    policy BEFORE giving them the booking link.
 4. If they're not a fit, politely decline or redirect.
 
-RESPOND WITH VALID JSON ONLY — no markdown, no explanation outside the JSON:
-{{
-    "is_approved": true/false,
-    "vibe_score": 0.0-1.0,
-    "reasoning": "Brief internal note on why you scored them this way",
-    "draft_reply": "The actual message to send back to the client",
-    "requires_policy_confirmation": true/false,
-    "detected_intent": "service_inquiry" | "pricing" | "policy_bypass" | "spam" | "other"
-}}
-
 If requires_policy_confirmation is true, your draft_reply should ask them to
 confirm they accept the deposit/cancellation policy before you provide the
 booking link.
@@ -93,12 +117,6 @@ evaluate whether their reply constitutes a clear acceptance.
 Acceptable: "yes", "sounds good", "I agree", "that works", "ok deal", etc.
 Not acceptable: ignoring the policy, changing the subject, asking for exceptions.
 
-RESPOND WITH VALID JSON ONLY:
-{{
-    "confirmed": true/false,
-    "draft_reply": "Your response to the client"
-}}
-
 If confirmed is true, your draft_reply should include the booking link:{booking_line}
 If confirmed is false, your draft_reply should re-state the policy requirement gently.
 """
@@ -141,11 +159,13 @@ def evaluate_lead(
             "detected_intent": "other",
         }
 
-    system_prompt = _build_vibe_check_prompt(config)
+    system_prompt = get_cached_prompt(config, "vibe_check", _build_vibe_check_prompt)
 
-    result = call_llm_json(
-        system_prompt=system_prompt,
-        user_message=f"Instagram DM from @{sender_ig} ({sender_name}):\n\n{message}",
+    result = _call_llm_json_cached(
+        system_prompt,
+        f"Instagram DM from @{sender_ig} ({sender_name}):\n\n{message}",
+        _VIBE_CHECK_SCHEMA,
+        cache_key=f"vibe_check:{config['studio']['id']}",
     )
 
     if dry_run:
@@ -238,26 +258,30 @@ def evaluate_policy_confirmation(
     if not config:
         return {"confirmed": False, "draft_reply": "Studio not configured."}
 
-    system_prompt = _build_confirmation_prompt(config)
+    system_prompt = get_cached_prompt(config, "vibe_check_confirmation", _build_confirmation_prompt)
 
-    result = call_llm_json(
-        system_prompt=system_prompt,
-        user_message=f"Client reply:\n\n{message}",
+    result = _call_llm_json_cached(
+        system_prompt,
+        f"Client reply:\n\n{message}",
+        _CONFIRMATION_SCHEMA,
+        cache_key=f"vibe_check_confirmation:{config['studio']['id']}",
     )
 
     if result.get("confirmed"):
-        update_client_intake(
+        changed = update_client_intake(
             client_id=client_id,
             status="approved",
             vibe_score=1.0,
             reasoning="Policy confirmed by client.",
         )
-        log_event(
-            agent="vibe_check",
-            action="policy_confirmed",
-            metadata={"client_id": client_id},
-            studio_id=studio_id,
-        )
+        # A repeat "yes" from an already-confirmed client isn't a new event
+        if changed:
+            log_event(
+                agent="vibe_check",
+                action="policy_confirmed",
+                metadata={"client_id": client_id},
+                studio_id=studio_id,
+            )
     else:
         log_event(
             agent="vibe_check",
@@ -269,6 +293,23 @@ def evaluate_policy_confirmation(
     return result
 
 
+def _call_llm_json_cached(system_prompt: str, user_message: str, schema: dict, cache_key: str = "") -> dict:
+    """
+    Exact repeats come from the LLM response cache; misses pass `cache_key`
+    so the provider reuses its prefix cache of the studio's system prompt.
+    """
+    return llm_cache.get_or_compute(
+        llm_cache.make_key(system_prompt, user_message),
+        lambda: call_llm_json(
+            system_prompt=system_prompt,
+            user_message=user_message,
+            cache_key=cache_key,
+            schema=schema,
+        ),
+        ttl=_DM_EVAL_CACHE_TTL,
+    )
+
+
 # ── Demo / CLI test ──────────────────────────────────────────────────
 
 if __name__ == "__main__":
@@ -8,8 +8,11 @@ Also supports slug-based public lookups (no auth needed for onboarding).
 from fastapi import Header, HTTPException, Depends
 from backend.database import get_studio_by_api_key, get_default_studio
 
+# Plain `def` dependencies: FastAPI runs them in its threadpool, so a studio
+# cache miss queries SQLite there instead of blocking the event loop.
 
-async def get_current_studio(x_api_key: str = Header(default="")):
+
+def get_current_studio(x_api_key: str = Header(default="")):
     """
     FastAPI dependency: require a valid API key.
     Returns the studio dict or raises 401.
@@ -24,7 +27,7 @@ async def get_current_studio(x_api_key: str = Header(default="")):
     return studio
 
 
-async def get_optional_studio(x_api_key: str = Header(default="")):
+def get_optional_studio(x_api_key: str = Header(default="")):
     """
     FastAPI dependency: optionally authenticate.
     Returns the studio dict if key provided, or the default studio, or None.
@@ -5,46 +5,152 @@ Multi-tenant: every record belongs to a studio via studio_id.
 """
 
 import sqlite3
-import json
+import logging
+import hashlib
 import uuid
 import secrets
 import re
+import queue
+import atexit
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from contextlib import contextmanager
 
+import orjson
+
+from backend.cache import TTLCache
 from config.settings import DB_PATH, STUDIO_NAME, DEPOSIT_AMOUNT, LATE_FEE
 
+logger = logging.getLogger(__name__)
+
+_STREAM_BATCH_SIZE = 200
+_MMAP_SIZE = 256 * 1024 * 1024
+_PAGE_CACHE_KB = 16 * 1024  # per pooled connection
+_STATEMENT_CACHE_SIZE = 256
+
 
 def _ensure_db_dir():
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 
-@contextmanager
-def get_db():
-    """Yield a SQLite connection with row_factory set."""
+# ── Connection pool ──────────────────────────────────────────────────
+#
+# Connections are long-lived and reused across calls and threads (one
+# thread at a time), so connect + PRAGMA setup is paid once per connection
+# instead of once per helper call. WAL lets pooled readers run alongside
+# the writer. Bursts beyond _POOL_MAX_IDLE open extra connections that are
+# closed on return.
+
+_POOL_MAX_IDLE = 8
+
+_idle_connections: queue.LifoQueue = queue.LifoQueue()
+
+_OPTIMIZE_INTERVAL = 3600  # seconds
+_last_optimize = time.monotonic()
+
+
+def _connect() -> sqlite3.Connection:
     _ensure_db_dir()
-    conn = sqlite3.connect(str(DB_PATH))
+    # Pooled connections live long enough for the statement cache to pay off;
+    # sized to hold every distinct query in this module.
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, cached_statements=_STATEMENT_CACHE_SIZE)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
+    # journal_mode=WAL is persistent and set once in init_db; these are per-connection
+    conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL; fsync only at checkpoints
+    conn.execute("PRAGMA temp_store=MEMORY")  # sorts/temp b-trees for IN lists stay off disk
+    conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")  # reads served from the shared OS page cache
+    conn.execute(f"PRAGMA cache_size=-{_PAGE_CACHE_KB}")  # kept warm between checkouts
     conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def _checkout() -> sqlite3.Connection:
+    path = str(DB_PATH)
+    while True:
+        try:
+            conn_path, conn = _idle_connections.get_nowait()
+        except queue.Empty:
+            return _connect()
+        if conn_path == path:
+            return conn
+        conn.close()  # DB_PATH changed since this connection was opened
+
+
+def _checkin(conn: sqlite3.Connection):
+    global _last_optimize
+    # Long-lived connections never hit the usual optimize-on-close, so refresh
+    # planner stats from one of them about once an hour
+    now = time.monotonic()
+    if now - _last_optimize > _OPTIMIZE_INTERVAL:
+        _last_optimize = now
+        conn.execute("PRAGMA optimize")
+    if _idle_connections.qsize() < _POOL_MAX_IDLE:
+        _idle_connections.put((str(DB_PATH), conn))
+    else:
+        conn.close()
+
+
+def _close_idle_connections():
+    while True:
+        try:
+            _, conn = _idle_connections.get_nowait()
+        except queue.Empty:
+            return
+        conn.close()
+
+
+atexit.register(_close_idle_connections)
+
+
+@contextmanager
+def get_db():
+    """Yield a pooled SQLite connection with row_factory set; commits on success."""
+    conn = _checkout()
     try:
         yield conn
         conn.commit()
-    except Exception:
+    except BaseException:
+        # Also covers abandoned generators (GeneratorExit) that may leave a
+        # statement mid-step; such connections are dropped, not pooled.
         conn.rollback()
-        raise
-    finally:
         conn.close()
+        raise
+    _checkin(conn)
+
+
+@contextmanager
+def get_write_db():
+    """
+    Like get_db, but opens the transaction with BEGIN IMMEDIATE so the write
+    lock is taken up front. A deferred transaction that reads and then writes
+    can fail with SQLITE_BUSY if another connection committed in between;
+    this one waits for the lock (busy timeout) before reading instead.
+    """
+    with get_db() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+
+
+def _rows_to_dicts(rows: list[sqlite3.Row]) -> list[dict]:
+    """Convert a result list to dicts, resolving the column names once rather than per row."""
+    if not rows:
+        return []
+    keys = rows[0].keys()
+    return [dict(zip(keys, r)) for r in rows]
 
 
 def new_id() -> str:
     return str(uuid.uuid4())
 
 
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
 def _generate_slug(name: str) -> str:
     """Turn 'Nails by Nina' into 'nails-by-nina'."""
-    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+    slug = _SLUG_RE.sub("-", name.lower()).strip("-")
     return slug or "studio"
 
 
@@ -54,9 +160,29 @@ def _generate_api_key() -> str:
 
 # ── Schema & Migration ───────────────────────────────────────────────
 
+# Stored in the file's PRAGMA user_version. Bump whenever the DDL or the
+# migrations below change, or existing databases won't pick them up.
+SCHEMA_VERSION = 2
+
+
 def init_db():
     """Create all tables. Safe to call multiple times."""
+    # Up-to-date databases skip the DDL script and migrations entirely
+    with get_db() as db:
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+    if version < SCHEMA_VERSION:
+        _create_schema()
+        with get_db() as db:
+            db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    # Seed default studio if none exist
+    _seed_default_studio()
+
+
+def _create_schema():
+    """Create tables and indexes, run migrations, and refresh planner stats."""
     with get_db() as db:
+        db.execute("PRAGMA journal_mode=WAL")  # stored in the DB file
         db.executescript("""
             -- ── Studios (the tenant) ────────────────────────────
             CREATE TABLE IF NOT EXISTS studios (
@@ -141,6 +267,8 @@ def init_db():
             CREATE INDEX IF NOT EXISTS idx_bookings_scheduled ON bookings(scheduled_at);
             CREATE INDEX IF NOT EXISTS idx_bookings_status ON bookings(status);
             CREATE INDEX IF NOT EXISTS idx_bookings_studio ON bookings(studio_id);
+            CREATE INDEX IF NOT EXISTS idx_bookings_status_sched ON bookings(status, scheduled_at);
+            CREATE INDEX IF NOT EXISTS idx_bookings_studio_sched ON bookings(studio_id, status, scheduled_at);
 
             -- ── Waitlist ────────────────────────────────────────
             CREATE TABLE IF NOT EXISTS waitlist (
@@ -176,6 +304,7 @@ def init_db():
                 used        INTEGER DEFAULT 0,
                 created_at  TEXT DEFAULT (datetime('now'))
             );
+            CREATE INDEX IF NOT EXISTS idx_magic_tokens_gc ON magic_tokens(used, expires_at);
 
             -- ── Social Leads (Social Hunter) ─────────────────────
             CREATE TABLE IF NOT EXISTS social_leads (
@@ -199,6 +328,32 @@ def init_db():
             CREATE INDEX IF NOT EXISTS idx_social_leads_studio ON social_leads(studio_id);
             CREATE INDEX IF NOT EXISTS idx_social_leads_status ON social_leads(studio_id, status);
             CREATE INDEX IF NOT EXISTS idx_social_leads_post_id ON social_leads(post_id);
+
+            -- ── LLM Response Cache ─────────────────────────────
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key         TEXT PRIMARY KEY,
+                value       TEXT NOT NULL,
+                created_at  INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at);
+
+            -- ── Social Hunter Scan Cursors ─────────────────────
+            -- PK-lookup-only tables are WITHOUT ROWID: the row lives in the
+            -- PK B-tree, so a lookup is one seek instead of index → rowid → row.
+            CREATE TABLE IF NOT EXISTS scan_cursors (
+                studio_id   TEXT NOT NULL REFERENCES studios(id),
+                subreddit   TEXT NOT NULL,
+                last_utc    INTEGER NOT NULL,
+                PRIMARY KEY (studio_id, subreddit)
+            ) WITHOUT ROWID;
+
+            -- ── Geocode Cache ──────────────────────────────────
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                location    TEXT PRIMARY KEY,
+                lat         REAL NOT NULL,
+                lng         REAL NOT NULL,
+                updated_at  INTEGER NOT NULL
+            ) WITHOUT ROWID;
         """)
 
     # ── Migrations (safe to re-run) ────────────────────────────────
@@ -206,9 +361,15 @@ def init_db():
     _migrate_add_social_hunter()
     _migrate_add_location_column()
     _migrate_add_google_maps_platform()
+    _migrate_add_social_leads_seen_index()
+    _migrate_add_dashboard_counters()
+    _migrate_hash_gmaps_review_ids()
 
-    # Seed default studio if none exist
-    _seed_default_studio()
+    # Planner stats for the indexes above; analysis_limit keeps this fast on
+    # large tables. Re-run ANALYZE by hand after large bulk deletes.
+    with get_db() as db:
+        db.execute("PRAGMA analysis_limit=400")
+        db.execute("ANALYZE")
 
 
 def _migrate_add_email_column():
@@ -302,6 +463,105 @@ def _migrate_add_google_maps_platform():
         """)
 
 
+def _migrate_add_social_leads_seen_index():
+    """Index (studio_id, post_id) so `seen_post_ids` is answered from the index alone."""
+    with get_db() as db:
+        db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_social_leads_studio_post ON social_leads(studio_id, post_id)"
+        )
+
+
+# Dashboard metrics are kept as per-studio running totals, maintained by
+# triggers on the source tables so the dashboard never re-scans history.
+# table -> (metric expression, delta expression, columns whose update moves the row)
+_DASHBOARD_COUNTER_SOURCES = {
+    "bookings": (
+        "'found_money'",
+        "{row}.final_price - {row}.original_price",
+        "studio_id, final_price, original_price",
+    ),
+    "clients": (
+        "CASE {row}.intake_status WHEN 'approved' THEN 'leads_approved' "
+        "WHEN 'declined' THEN 'leads_filtered' END",
+        "1",
+        "studio_id, intake_status",
+    ),
+    "agent_events": (
+        "CASE WHEN {row}.agent='vibe_check' THEN 'ai_chats' "
+        "WHEN {row}.agent='gap_filler' AND {row}.action='slot_filled' THEN 'gap_fills' "
+        "WHEN {row}.agent='social_hunter' AND {row}.action='lead_found' THEN 'social_leads_found' END",
+        "1",
+        "studio_id, agent, action",
+    ),
+}
+
+
+def _counter_add(table: str, row: str, sign: str) -> str:
+    """Trigger statement adding `row`'s (OLD/NEW) contribution to its studio's counter."""
+    metric, delta, _ = _DASHBOARD_COUNTER_SOURCES[table]
+    metric, delta = metric.format(row=row), delta.format(row=row)
+    return f"""
+        INSERT INTO dashboard_counters (studio_id, metric, value)
+        SELECT COALESCE({row}.studio_id, ''), {metric}, {sign}({delta}) WHERE {metric} IS NOT NULL
+        ON CONFLICT(studio_id, metric) DO UPDATE SET value = value + excluded.value;"""
+
+
+def _migrate_add_dashboard_counters():
+    """Create dashboard_counters, its triggers, and backfill totals from existing rows."""
+    with get_write_db() as db:
+        exists = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='dashboard_counters'"
+        ).fetchone()
+        if exists:
+            return
+        # Indexes that only served the old count queries
+        for index in ("idx_clients_studio_intake", "idx_clients_intake", "idx_bookings_studio_price",
+                      "idx_events_studio_agent_action", "idx_events_agent_action"):
+            db.execute(f"DROP INDEX IF EXISTS {index}")
+        db.execute("""
+            CREATE TABLE dashboard_counters (
+                studio_id   TEXT NOT NULL,  -- '' for rows without a studio
+                metric      TEXT NOT NULL,
+                value       REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (studio_id, metric)
+            ) WITHOUT ROWID
+        """)
+        for table, (metric, delta, columns) in _DASHBOARD_COUNTER_SOURCES.items():
+            db.execute(f"CREATE TRIGGER trg_{table}_counters_ins AFTER INSERT ON {table} BEGIN"
+                       f"{_counter_add(table, 'NEW', '+')} END")
+            db.execute(f"CREATE TRIGGER trg_{table}_counters_upd AFTER UPDATE OF {columns} ON {table} BEGIN"
+                       f"{_counter_add(table, 'OLD', '-')}{_counter_add(table, 'NEW', '+')} END")
+            db.execute(f"CREATE TRIGGER trg_{table}_counters_del AFTER DELETE ON {table} BEGIN"
+                       f"{_counter_add(table, 'OLD', '-')} END")
+            # Same transaction as the triggers, so no row is counted twice or missed
+            metric, delta = metric.format(row=table), delta.format(row=table)
+            db.execute(f"""
+                INSERT INTO dashboard_counters (studio_id, metric, value)
+                SELECT COALESCE(studio_id, ''), {metric} AS m, SUM({delta}) FROM {table}
+                WHERE m IS NOT NULL GROUP BY 1, 2
+            """)
+
+
+def _migrate_hash_gmaps_review_ids():
+    """
+    Rewrite Google Maps lead IDs from "gmaps_{place}_{author}_{rating}" to
+    the hashed form built by `google_maps._review_id`, so reviews seen
+    before the switch still dedup. Hashed IDs contain no "_" after the prefix.
+    """
+    with get_write_db() as db:
+        rows = db.execute(
+            "SELECT id, post_id FROM social_leads "
+            "WHERE platform='google_maps' AND post_id LIKE 'gmaps%' AND instr(substr(post_id, 7), '_') > 0"
+        ).fetchall()
+        db.executemany(
+            "UPDATE social_leads SET post_id=? WHERE id=?",
+            [
+                ("gmaps_" + hashlib.blake2b(row["post_id"][6:].encode(), digest_size=8).hexdigest(), row["id"])
+                for row in rows
+            ],
+        )
+
+
 def _seed_default_studio():
     """Create a default studio from .env values if no studios exist."""
     with get_db() as db:
@@ -325,38 +585,54 @@ def create_studio(name: str, owner_name: str, phone: str = "", ig_handle: str =
     base_slug = _generate_slug(name)
     api_key = _generate_api_key()
 
-    # Handle slug collisions
+    # Handle slug collisions: the insert is skipped if the slug is taken,
+    # then retried with a random suffix
     slug = base_slug
-    with get_db() as db:
-        existing = db.execute("SELECT COUNT(*) AS c FROM studios WHERE slug=?", (slug,)).fetchone()["c"]
-        if existing > 0:
-            slug = f"{base_slug}-{secrets.token_hex(3)}"
-
-        db.execute(
+    with get_write_db() as db:
+        while db.execute(
             """INSERT INTO studios (id, slug, api_key, name, owner_name, phone, ig_handle, email)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(slug) DO NOTHING RETURNING id""",
             (studio_id, slug, api_key, name, owner_name, phone, ig_handle, email),
-        )
+        ).fetchone() is None:
+            slug = f"{base_slug}-{secrets.token_hex(3)}"
 
+    _invalidate_studio_cache()
     return {"id": studio_id, "slug": slug, "api_key": api_key, "name": name}
 
 
+# Studio rows are read on every authenticated request and change rarely;
+# lookups are cached briefly and dropped whenever a studio is written.
+_STUDIO_CACHE_TTL = 30
+_studio_cache = TTLCache(maxsize=512, ttl=_STUDIO_CACHE_TTL)
+
+
+def _get_studio_cached(cache_key: tuple, sql: str, params: tuple = ()) -> dict | None:
+    studio = _studio_cache.get(cache_key)
+    if studio is None:
+        with get_db() as db:
+            row = db.execute(sql, params).fetchone()
+        if not row:
+            return None  # misses aren't cached, so new studios show up immediately
+        studio = dict(row)
+        _studio_cache.set(cache_key, studio)
+    return dict(studio)  # callers get their own copy
+
+
+def _invalidate_studio_cache():
+    _studio_cache.clear()
+
+
 def get_studio_by_slug(slug: str) -> dict | None:
-    with get_db() as db:
-        row = db.execute("SELECT * FROM studios WHERE slug=?", (slug,)).fetchone()
-    return dict(row) if row else None
+    return _get_studio_cached(("slug", slug), "SELECT * FROM studios WHERE slug=?", (slug,))
 
 
 def get_studio_by_api_key(api_key: str) -> dict | None:
-    with get_db() as db:
-        row = db.execute("SELECT * FROM studios WHERE api_key=?", (api_key,)).fetchone()
-    return dict(row) if row else None
+    return _get_studio_cached(("api_key", api_key), "SELECT * FROM studios WHERE api_key=?", (api_key,))
 
 
 def get_default_studio() -> dict | None:
-    with get_db() as db:
-        row = db.execute("SELECT * FROM studios ORDER BY created_at ASC LIMIT 1").fetchone()
-    return dict(row) if row else None
+    return _get_studio_cached(("default",), "SELECT * FROM studios ORDER BY created_at ASC LIMIT 1")
 
 
 def update_studio(studio_id: str, **fields):
@@ -368,15 +644,16 @@ def update_studio(studio_id: str, **fields):
         return
     set_clause = ", ".join(f"{k}=?" for k in updates)
     values = list(updates.values()) + [studio_id]
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute(f"UPDATE studios SET {set_clause} WHERE id=?", values)
+    _invalidate_studio_cache()
 
 
 # ── Service CRUD ─────────────────────────────────────────────────────
 
 def create_service(studio_id: str, name: str, price: float, duration_min: int) -> str:
     service_id = new_id()
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute(
             "INSERT INTO services (id, studio_id, name, price, duration_min) VALUES (?, ?, ?, ?, ?)",
             (service_id, studio_id, name, price, duration_min),
@@ -390,7 +667,51 @@ def get_services_for_studio(studio_id: str) -> list[dict]:
             "SELECT * FROM services WHERE studio_id=? AND active=1 ORDER BY created_at",
             (studio_id,),
         ).fetchall()
-    return [dict(r) for r in rows]
+    return _rows_to_dicts(rows)
+
+
+def get_services_with_addons(studio_id: str) -> list[dict]:
+    """Active services for a studio, each with its add-ons under "addons" — one query."""
+    with get_db() as db:
+        rows = db.execute(
+            """SELECT s.id, s.studio_id, s.name, s.price, s.duration_min, s.active, s.created_at,
+                      a.id AS addon_id, a.name AS addon_name, a.price AS addon_price,
+                      a.duration_min AS addon_duration_min, a.pitch AS addon_pitch,
+                      a.created_at AS addon_created_at
+               FROM services s
+               LEFT JOIN service_addons a ON a.service_id = s.id
+               WHERE s.studio_id=? AND s.active=1
+               ORDER BY s.created_at, s.rowid, a.created_at, a.rowid""",
+            (studio_id,),
+        ).fetchall()
+
+    services: dict[str, dict] = {}
+    for r in rows:
+        svc = services.get(r["id"])
+        if svc is None:
+            svc = {
+                "id": r["id"],
+                "studio_id": r["studio_id"],
+                "name": r["name"],
+                "price": r["price"],
+                "duration_min": r["duration_min"],
+                "active": r["active"],
+                "created_at": r["created_at"],
+                "addons": [],
+            }
+            services[r["id"]] = svc
+        if r["addon_id"]:
+            svc["addons"].append({
+                "id": r["addon_id"],
+                "service_id": r["id"],
+                "studio_id": r["studio_id"],
+                "name": r["addon_name"],
+                "price": r["addon_price"],
+                "duration_min": r["addon_duration_min"],
+                "pitch": r["addon_pitch"],
+                "created_at": r["addon_created_at"],
+            })
+    return list(services.values())
 
 
 def update_service(service_id: str, **fields):
@@ -400,12 +721,12 @@ def update_service(service_id: str, **fields):
         return
     set_clause = ", ".join(f"{k}=?" for k in updates)
     values = list(updates.values()) + [service_id]
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute(f"UPDATE services SET {set_clause} WHERE id=?", values)
 
 
 def delete_service(service_id: str):
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute("DELETE FROM service_addons WHERE service_id=?", (service_id,))
         db.execute("DELETE FROM services WHERE id=?", (service_id,))
 
@@ -414,7 +735,7 @@ def delete_service(service_id: str):
 
 def create_addon(service_id: str, studio_id: str, name: str, price: float, duration_min: int, pitch: str = "") -> str:
     addon_id = new_id()
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute(
             """INSERT INTO service_addons (id, service_id, studio_id, name, price, duration_min, pitch)
                VALUES (?, ?, ?, ?, ?, ?, ?)""",
@@ -429,7 +750,7 @@ def get_addons_for_service(service_id: str) -> list[dict]:
             "SELECT * FROM service_addons WHERE service_id=? ORDER BY created_at",
             (service_id,),
         ).fetchall()
-    return [dict(r) for r in rows]
+    return _rows_to_dicts(rows)
 
 
 def get_addons_for_studio(studio_id: str) -> list[dict]:
@@ -438,7 +759,7 @@ def get_addons_for_studio(studio_id: str) -> list[dict]:
             "SELECT * FROM service_addons WHERE studio_id=? ORDER BY created_at",
             (studio_id,),
         ).fetchall()
-    return [dict(r) for r in rows]
+    return _rows_to_dicts(rows)
 
 
 def update_addon(addon_id: str, **fields):
@@ -448,12 +769,12 @@ def update_addon(addon_id: str, **fields):
         return
     set_clause = ", ".join(f"{k}=?" for k in updates)
     values = list(updates.values()) + [addon_id]
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute(f"UPDATE service_addons SET {set_clause} WHERE id=?", values)
 
 
 def delete_addon(addon_id: str):
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute("DELETE FROM service_addons WHERE id=?", (addon_id,))
 
 
@@ -461,7 +782,7 @@ def delete_addon(addon_id: str):
 
 def create_client(name: str, phone: str = "", instagram_handle: str = "", studio_id: str = "") -> str:
     client_id = new_id()
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute(
             "INSERT INTO clients (id, studio_id, name, phone, instagram_handle) VALUES (?, ?, ?, ?, ?)",
             (client_id, studio_id or None, name, phone, instagram_handle),
@@ -469,12 +790,15 @@ def create_client(name: str, phone: str = "", instagram_handle: str = "", studio
     return client_id
 
 
-def update_client_intake(client_id: str, status: str, vibe_score: float, reasoning: str):
-    with get_db() as db:
-        db.execute(
-            "UPDATE clients SET intake_status=?, vibe_score=?, intake_reasoning=? WHERE id=?",
-            (status, vibe_score, reasoning, client_id),
+def update_client_intake(client_id: str, status: str, vibe_score: float, reasoning: str) -> int:
+    """Set a client's intake result. Returns 0 if the row already held these values."""
+    with get_write_db() as db:
+        cur = db.execute(
+            """UPDATE clients SET intake_status=?, vibe_score=?, intake_reasoning=?
+               WHERE id=? AND (intake_status IS NOT ? OR vibe_score IS NOT ? OR intake_reasoning IS NOT ?)""",
+            (status, vibe_score, reasoning, client_id, status, vibe_score, reasoning),
         )
+        return cur.rowcount
 
 
 # ── Booking helpers (now with studio_id) ─────────────────────────────
@@ -488,7 +812,7 @@ def create_booking(
     studio_id: str = "",
 ) -> str:
     booking_id = new_id()
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute(
             """INSERT INTO bookings
                (id, studio_id, client_id, service, original_price, final_price, scheduled_at, source)
@@ -499,50 +823,77 @@ def create_booking(
 
 
 def add_upsell_to_booking(booking_id: str, add_on_name: str, add_on_price: float):
-    with get_db() as db:
-        row = db.execute("SELECT add_ons, final_price FROM bookings WHERE id=?", (booking_id,)).fetchone()
-        if not row:
-            return
-        current_addons = json.loads(row["add_ons"])
-        current_addons.append({"name": add_on_name, "price": add_on_price})
-        new_price = row["final_price"] + add_on_price
+    # Appended in SQL (JSON1) so concurrent upsells can't overwrite each other
+    with get_write_db() as db:
         db.execute(
-            "UPDATE bookings SET add_ons=?, final_price=? WHERE id=?",
-            (json.dumps(current_addons), new_price, booking_id),
+            """UPDATE bookings
+               SET add_ons = json_insert(COALESCE(NULLIF(add_ons, ''), '[]'), '$[#]',
+                                         json_object('name', ?, 'price', ?)),
+                   final_price = final_price + ?
+               WHERE id=?""",
+            (add_on_name, add_on_price, add_on_price, booking_id),
         )
 
 
 def cancel_booking(booking_id: str):
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute("UPDATE bookings SET status='cancelled' WHERE id=?", (booking_id,))
 
 
-def get_upcoming_bookings_in_window(hours_from_now: int = 24, studio_id: str = ""):
+def upcoming_booking_window(hours_from_now: int = 24) -> tuple[str, str]:
+    """
+    (now, now + `hours_from_now`) in the same format as datetime('now'), for
+    paging through one fixed window with `get_upcoming_bookings_page`.
+    """
+    now = datetime.utcnow()
+    return (
+        now.strftime("%Y-%m-%d %H:%M:%S"),
+        (now + timedelta(hours=hours_from_now)).strftime("%Y-%m-%d %H:%M:%S"),
+    )
+
+
+def get_upcoming_bookings_page(
+    after: tuple[str, str],
+    until: str,
+    studio_id: str = "",
+    limit: int = _STREAM_BATCH_SIZE,
+) -> list[dict]:
+    """
+    One page of confirmed bookings ordered by (scheduled_at, id), starting
+    just past the `after` key and ending at `until`. Start with
+    (window start, "") and pass the last row's key for the next page; each
+    page is its own short read, so long consumers never hold a connection.
+    """
+    after_at, after_id = after
     with get_db() as db:
         if studio_id:
             rows = db.execute(
                 """SELECT b.*, c.name AS client_name, c.phone AS client_phone
                    FROM bookings b JOIN clients c ON c.id = b.client_id
                    WHERE b.studio_id=? AND b.status = 'confirmed'
-                     AND b.scheduled_at BETWEEN datetime('now') AND datetime('now', ? || ' hours')""",
-                (studio_id, str(hours_from_now)),
+                     AND b.scheduled_at BETWEEN ? AND ?
+                     AND (b.scheduled_at, b.id) > (?, ?)
+                   ORDER BY b.scheduled_at, b.id LIMIT ?""",
+                (studio_id, after_at, until, after_at, after_id, limit),
             ).fetchall()
         else:
             rows = db.execute(
                 """SELECT b.*, c.name AS client_name, c.phone AS client_phone
                    FROM bookings b JOIN clients c ON c.id = b.client_id
                    WHERE b.status = 'confirmed'
-                     AND b.scheduled_at BETWEEN datetime('now') AND datetime('now', ? || ' hours')""",
-                (str(hours_from_now),),
+                     AND b.scheduled_at BETWEEN ? AND ?
+                     AND (b.scheduled_at, b.id) > (?, ?)
+                   ORDER BY b.scheduled_at, b.id LIMIT ?""",
+                (after_at, until, after_at, after_id, limit),
             ).fetchall()
-    return [dict(r) for r in rows]
+    return _rows_to_dicts(rows)
 
 
 # ── Waitlist helpers (now with studio_id) ────────────────────────────
 
 def add_to_waitlist(client_id: str, service: str, preferred_at: str = "", studio_id: str = "") -> str:
     entry_id = new_id()
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute(
             "INSERT INTO waitlist (id, studio_id, client_id, service, preferred_at) VALUES (?, ?, ?, ?, ?)",
             (entry_id, studio_id or None, client_id, service, preferred_at),
@@ -568,28 +919,138 @@ def get_waitlist_for_service(service: str, studio_id: str = ""):
                    ORDER BY w.created_at ASC""",
                 (service,),
             ).fetchall()
-    return [dict(r) for r in rows]
+    return _rows_to_dicts(rows)
+
+
+def cancel_booking_and_claim_waitlist(booking_id: str, service: str, studio_id: str = "") -> dict | None:
+    """
+    Cancel a booking and claim the next waitlisted client for the same
+    service in a single write transaction.
+
+    The claimed entry is marked notified inside the transaction, so two
+    concurrent cancellations can never notify the same person. Returns the
+    claimed entry (with client_name / client_phone) or None if nobody is waiting.
+    """
+    with get_write_db() as db:
+        db.execute("UPDATE bookings SET status='cancelled' WHERE id=?", (booking_id,))
+        if studio_id:
+            row = db.execute(
+                """SELECT w.*, c.name AS client_name, c.phone AS client_phone
+                   FROM waitlist w JOIN clients c ON c.id = w.client_id
+                   WHERE w.studio_id=? AND w.service = ? AND w.notified = 0
+                   ORDER BY w.created_at ASC LIMIT 1""",
+                (studio_id, service),
+            ).fetchone()
+        else:
+            row = db.execute(
+                """SELECT w.*, c.name AS client_name, c.phone AS client_phone
+                   FROM waitlist w JOIN clients c ON c.id = w.client_id
+                   WHERE w.service = ? AND w.notified = 0
+                   ORDER BY w.created_at ASC LIMIT 1""",
+                (service,),
+            ).fetchone()
+        if row:
+            db.execute("UPDATE waitlist SET notified=1 WHERE id=?", (row["id"],))
+    return dict(row) if row else None
 
 
 def mark_waitlist_notified(entry_id: str):
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute("UPDATE waitlist SET notified=1 WHERE id=?", (entry_id,))
 
 
 # ── Event logging (now with studio_id) ───────────────────────────────
+#
+# Events are queued in memory and written in batches by a background
+# thread (every _EVENT_FLUSH_INTERVAL seconds, or sooner once
+# _EVENT_FLUSH_SIZE are pending). Readers call flush_events() first so
+# the dashboard always sees everything logged so far.
+
+_EVENT_FLUSH_SIZE = 200
+_EVENT_FLUSH_INTERVAL = 1.0  # seconds
+
+_INSERT_EVENT_SQL = (
+    "INSERT INTO agent_events (id, studio_id, agent, action, metadata, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+_event_queue: queue.SimpleQueue = queue.SimpleQueue()
+_flush_lock = threading.Lock()
+_flush_now = threading.Event()
+_event_writer_started = False
+_event_writer_lock = threading.Lock()
+
 
 def log_event(agent: str, action: str, metadata: dict | None = None, studio_id: str = ""):
-    with get_db() as db:
-        db.execute(
-            "INSERT INTO agent_events (id, studio_id, agent, action, metadata) VALUES (?, ?, ?, ?, ?)",
-            (new_id(), studio_id or None, agent, action, json.dumps(metadata or {})),
-        )
+    """Queue an agent event for the background writer. Returns immediately."""
+    _ensure_event_writer()
+    _event_queue.put((
+        new_id(),
+        studio_id or None,
+        agent,
+        action,
+        orjson.dumps(metadata or {}, option=orjson.OPT_NON_STR_KEYS).decode(),
+        datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),  # same format as datetime('now')
+    ))
+    if _event_queue.qsize() >= _EVENT_FLUSH_SIZE:
+        _flush_now.set()
+
+
+def log_events_bulk(events: list[tuple]):
+    """Insert many event rows in one transaction. Rows match _INSERT_EVENT_SQL."""
+    try:
+        with get_write_db() as db:
+            db.executemany(_INSERT_EVENT_SQL, events)
+    except sqlite3.Error:
+        # One bad row fails the whole batch — retry row by row and skip offenders
+        for event in events:
+            try:
+                with get_write_db() as db:
+                    db.execute(_INSERT_EVENT_SQL, event)
+            except sqlite3.Error as e:
+                logger.warning("Dropping event %s/%s: %s", event[2], event[3], e)
+
+
+def flush_events():
+    """Write all queued events now."""
+    with _flush_lock:
+        batch = []
+        while True:
+            try:
+                batch.append(_event_queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            log_events_bulk(batch)
+
+
+def _ensure_event_writer():
+    global _event_writer_started
+    if _event_writer_started:
+        return
+    with _event_writer_lock:
+        if _event_writer_started:
+            return
+        threading.Thread(target=_event_writer, name="event-writer", daemon=True).start()
+        atexit.register(flush_events)
+        _event_writer_started = True
+
+
+def _event_writer():
+    while True:
+        _flush_now.wait(_EVENT_FLUSH_INTERVAL)
+        _flush_now.clear()
+        try:
+            flush_events()
+        except Exception:
+            logger.exception("Event flush failed")
 
 
 # ── Dashboard metrics (now filterable by studio) ─────────────────────
 
 def get_recent_events(studio_id: str = "", limit: int = 20) -> list[dict]:
     """Get recent agent events for the growth activity feed."""
+    flush_events()
     with get_db() as db:
         if studio_id:
             rows = db.execute(
@@ -603,11 +1064,9 @@ def get_recent_events(studio_id: str = "", limit: int = 20) -> list[dict]:
                 "SELECT id, agent, action, metadata, created_at FROM agent_events ORDER BY created_at DESC LIMIT ?",
                 (limit,),
             ).fetchall()
-    result = []
-    for r in rows:
-        entry = dict(r)
-        entry["metadata"] = json.loads(entry["metadata"]) if entry["metadata"] else {}
-        result.append(entry)
+    result = _rows_to_dicts(rows)
+    for entry in result:
+        entry["metadata"] = orjson.loads(entry["metadata"]) if entry["metadata"] else {}
     return result
 
 
@@ -615,21 +1074,19 @@ def get_recent_events(studio_id: str = "", limit: int = 20) -> list[dict]:
 
 def get_studio_by_email(email: str) -> dict | None:
     """Look up a studio by its owner's email address."""
-    with get_db() as db:
-        row = db.execute(
-            "SELECT * FROM studios WHERE email=? AND email != ''", (email.lower().strip(),)
-        ).fetchone()
-    return dict(row) if row else None
+    email = email.lower().strip()
+    return _get_studio_cached(("email", email), "SELECT * FROM studios WHERE email=? AND email != ''", (email,))
 
 
 def create_magic_token(studio_id: str) -> str:
     """Generate a magic link token with 15-minute expiry. Returns the token string."""
     token = secrets.token_urlsafe(32)
-    expires_at = (datetime.utcnow() + timedelta(minutes=15)).strftime("%Y-%m-%d %H:%M:%S")
-    with get_db() as db:
+    with get_write_db() as db:
+        # Expiry uses SQLite's clock, the same one validate_magic_token compares against
         db.execute(
-            "INSERT INTO magic_tokens (id, studio_id, token, expires_at) VALUES (?, ?, ?, ?)",
-            (new_id(), studio_id, token, expires_at),
+            """INSERT INTO magic_tokens (id, studio_id, token, expires_at)
+               VALUES (?, ?, ?, datetime('now', '+15 minutes'))""",
+            (new_id(), studio_id, token),
         )
     return token
 
@@ -639,7 +1096,7 @@ def validate_magic_token(token: str) -> dict | None:
     Check a magic link token. If valid (exists, not used, not expired),
     mark it used and return the studio dict. Otherwise return None.
     """
-    with get_db() as db:
+    with get_write_db() as db:
         row = db.execute(
             """SELECT mt.*, s.api_key, s.slug, s.name AS studio_name, s.id AS sid
                FROM magic_tokens mt
@@ -659,12 +1116,29 @@ def validate_magic_token(token: str) -> dict | None:
     }
 
 
-def cleanup_expired_tokens():
-    """Delete magic tokens that are expired or already used. Safe to call on startup."""
-    with get_db() as db:
-        db.execute(
-            "DELETE FROM magic_tokens WHERE used=1 OR expires_at < datetime('now')"
-        )
+_TOKEN_CLEANUP_BATCH = 1000
+
+
+def cleanup_expired_tokens() -> int:
+    """
+    Delete magic tokens that are expired or already used. Runs at startup and
+    periodically from the scheduler; deletes in batches so the write lock is
+    never held for long. Returns the number of tokens deleted.
+    """
+    deleted = 0
+    while True:
+        with get_write_db() as db:
+            # Both OR branches seek on idx_magic_tokens_gc (used, expires_at)
+            count = db.execute(
+                """DELETE FROM magic_tokens WHERE id IN (
+                       SELECT id FROM magic_tokens
+                       WHERE used=1 OR (used=0 AND expires_at < datetime('now'))
+                       LIMIT ?)""",
+                (_TOKEN_CLEANUP_BATCH,),
+            ).rowcount
+        deleted += count
+        if count < _TOKEN_CLEANUP_BATCH:
+            return deleted
 
 
 # ── Social Leads (Social Hunter) ─────────────────────────────────
@@ -685,7 +1159,7 @@ def save_social_lead(
 ) -> str:
     """Save a social lead found by the Social Hunter."""
     lead_id = new_id()
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute(
             """INSERT INTO social_leads
                (id, studio_id, platform, post_id, post_url, post_title, post_body,
@@ -697,24 +1171,59 @@ def save_social_lead(
     return lead_id
 
 
+def save_social_leads_bulk(leads: list[dict]) -> list[str]:
+    """
+    Save many social leads in one transaction. Each dict takes the same
+    keyword arguments as `save_social_lead`. Returns the new lead ids in order.
+    """
+    rows = [
+        {
+            "id": new_id(),
+            "post_url": "", "post_title": "", "post_body": "", "subreddit": "", "author": "",
+            "match_score": 0.0, "match_reasoning": "", "drafted_reply": "", "status": "new",
+            **lead,
+        }
+        for lead in leads
+    ]
+    if rows:
+        with get_write_db() as db:
+            db.executemany(
+                """INSERT INTO social_leads
+                   (id, studio_id, platform, post_id, post_url, post_title, post_body,
+                    subreddit, author, match_score, match_reasoning, drafted_reply, status)
+                   VALUES (:id, :studio_id, :platform, :post_id, :post_url, :post_title, :post_body,
+                           :subreddit, :author, :match_score, :match_reasoning, :drafted_reply, :status)""",
+                rows,
+            )
+    return [row["id"] for row in rows]
+
+
+# The lead list only shows a snippet of each post; the full row (stored body
+# up to 2000 chars) is served by get_social_lead_by_id.
+_SOCIAL_LEAD_LIST_SNIPPET = 200
+_SOCIAL_LEAD_LIST_COLUMNS = f"""id, platform, post_url, post_title,
+    substr(post_body, 1, {_SOCIAL_LEAD_LIST_SNIPPET}) AS post_body, subreddit, author,
+    match_score, match_reasoning, drafted_reply, status, created_at"""
+
+
 def get_social_leads(studio_id: str, status: str = "", limit: int = 50) -> list[dict]:
-    """Get social leads for a studio, optionally filtered by status."""
+    """Get social leads for a studio (list view), optionally filtered by status."""
     with get_db() as db:
         if status:
             rows = db.execute(
-                """SELECT * FROM social_leads
+                f"""SELECT {_SOCIAL_LEAD_LIST_COLUMNS} FROM social_leads
                    WHERE studio_id=? AND status=?
                    ORDER BY created_at DESC LIMIT ?""",
                 (studio_id, status, limit),
             ).fetchall()
         else:
             rows = db.execute(
-                """SELECT * FROM social_leads
+                f"""SELECT {_SOCIAL_LEAD_LIST_COLUMNS} FROM social_leads
                    WHERE studio_id=?
                    ORDER BY created_at DESC LIMIT ?""",
                 (studio_id, limit),
             ).fetchall()
-    return [dict(r) for r in rows]
+    return _rows_to_dicts(rows)
 
 
 def get_social_lead_by_id(lead_id: str) -> dict | None:
@@ -726,7 +1235,7 @@ def get_social_lead_by_id(lead_id: str) -> dict | None:
 
 def update_social_lead_status(lead_id: str, status: str):
     """Update the status of a social lead."""
-    with get_db() as db:
+    with get_write_db() as db:
         db.execute(
             "UPDATE social_leads SET status=? WHERE id=?",
             (status, lead_id),
@@ -736,54 +1245,121 @@ def update_social_lead_status(lead_id: str, status: str):
 def is_post_already_seen(studio_id: str, post_id: str) -> bool:
     """Check if a Reddit post has already been processed for a studio."""
     with get_db() as db:
-        count = db.execute(
-            "SELECT COUNT(*) AS c FROM social_leads WHERE studio_id=? AND post_id=?",
+        row = db.execute(
+            "SELECT 1 FROM social_leads WHERE studio_id=? AND post_id=? LIMIT 1",
             (studio_id, post_id),
-        ).fetchone()["c"]
-    return count > 0
+        ).fetchone()
+    return row is not None
+
+
+_SQLITE_MAX_PARAMS = 900  # stay under SQLite's default bound-parameter limit
+
+
+def seen_post_ids(studio_id: str, post_ids: list[str]) -> set[str]:
+    """Return which of `post_ids` have already been processed for a studio."""
+    seen = set()
+    with get_db() as db:
+        for start in range(0, len(post_ids), _SQLITE_MAX_PARAMS):
+            chunk = post_ids[start:start + _SQLITE_MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            rows = db.execute(
+                f"SELECT post_id FROM social_leads WHERE studio_id=? AND post_id IN ({placeholders})",
+                (studio_id, *chunk),
+            ).fetchall()
+            seen.update(r["post_id"] for r in rows)
+    return seen
+
+
+def get_scan_cursors(studio_id: str) -> dict[str, int]:
+    """Newest post time (unix seconds) already scanned, per subreddit."""
+    with get_db() as db:
+        rows = db.execute(
+            "SELECT subreddit, last_utc FROM scan_cursors WHERE studio_id=?", (studio_id,)
+        ).fetchall()
+    return {r["subreddit"]: r["last_utc"] for r in rows}
+
+
+def save_scan_cursors(studio_id: str, cursors: dict[str, int]):
+    """Advance per-subreddit scan cursors (never moves one backwards)."""
+    with get_write_db() as db:
+        db.executemany(
+            """INSERT INTO scan_cursors (studio_id, subreddit, last_utc) VALUES (?, ?, ?)
+               ON CONFLICT(studio_id, subreddit) DO UPDATE
+               SET last_utc = MAX(last_utc, excluded.last_utc)""",
+            [(studio_id, sub, last_utc) for sub, last_utc in cursors.items()],
+        )
+
+
+# ── LLM Response Cache ───────────────────────────────────────────────
+
+def get_llm_cache(key: str, max_age_sec: int) -> str | None:
+    """Return a cached LLM response if it is younger than `max_age_sec`."""
+    with get_db() as db:
+        row = db.execute(
+            "SELECT value FROM llm_cache WHERE key=? AND created_at >= ?",
+            (key, int(time.time()) - max_age_sec),
+        ).fetchone()
+    return row["value"] if row else None
+
+
+def set_llm_cache(key: str, value: str):
+    """Store (or refresh) a cached LLM response."""
+    with get_write_db() as db:
+        db.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+            (key, value, int(time.time())),
+        )
+
+
+def prune_llm_cache(max_entries: int):
+    """Evict the oldest cached responses beyond `max_entries`."""
+    with get_write_db() as db:
+        db.execute(
+            """DELETE FROM llm_cache WHERE key IN (
+                   SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+               )""",
+            (max_entries,),
+        )
+
+
+# ── Geocode Cache ────────────────────────────────────────────────────
+
+def get_cached_geocode(location: str, max_age_sec: int) -> dict | None:
+    """Return cached {"lat", "lng"} for a location if younger than `max_age_sec`."""
+    with get_db() as db:
+        row = db.execute(
+            "SELECT lat, lng FROM geocode_cache WHERE location=? AND updated_at >= ?",
+            (location, int(time.time()) - max_age_sec),
+        ).fetchone()
+    return {"lat": row["lat"], "lng": row["lng"]} if row else None
+
+
+def save_geocode(location: str, lat: float, lng: float):
+    with get_write_db() as db:
+        db.execute(
+            "INSERT OR REPLACE INTO geocode_cache (location, lat, lng, updated_at) VALUES (?, ?, ?, ?)",
+            (location, lat, lng, int(time.time())),
+        )
 
 
 # ── Dashboard metrics (now filterable by studio) ─────────────────────
 
 def get_dashboard_metrics(studio_id: str = "") -> dict:
+    flush_events()
+    # Running totals kept by the dashboard_counters triggers; one row per metric
+    where = "WHERE studio_id=?" if studio_id else ""
     with get_db() as db:
-        where = "WHERE studio_id=?" if studio_id else ""
-        params = (studio_id,) if studio_id else ()
-
-        found_money = db.execute(
-            f"SELECT COALESCE(SUM(final_price - original_price), 0) AS total FROM bookings {where}",
-            params,
-        ).fetchone()["total"]
-
-        evt_where = f"WHERE studio_id=? AND agent='vibe_check'" if studio_id else "WHERE agent='vibe_check'"
-        ai_chats = db.execute(
-            f"SELECT COUNT(*) AS total FROM agent_events {evt_where}",
-            params,
-        ).fetchone()["total"]
-
-        cl_where = f"WHERE studio_id=? AND intake_status='approved'" if studio_id else "WHERE intake_status='approved'"
-        approved = db.execute(
-            f"SELECT COUNT(*) AS total FROM clients {cl_where}",
-            params,
-        ).fetchone()["total"]
-
-        cl_dec_where = f"WHERE studio_id=? AND intake_status='declined'" if studio_id else "WHERE intake_status='declined'"
-        declined = db.execute(
-            f"SELECT COUNT(*) AS total FROM clients {cl_dec_where}",
-            params,
-        ).fetchone()["total"]
-
-        gf_where = f"WHERE studio_id=? AND agent='gap_filler' AND action='slot_filled'" if studio_id else "WHERE agent='gap_filler' AND action='slot_filled'"
-        gap_fills = db.execute(
-            f"SELECT COUNT(*) AS total FROM agent_events {gf_where}",
-            params,
-        ).fetchone()["total"]
-
-        sh_where = f"WHERE studio_id=? AND agent='social_hunter' AND action='lead_found'" if studio_id else "WHERE agent='social_hunter' AND action='lead_found'"
-        social_leads_found = db.execute(
-            f"SELECT COUNT(*) AS total FROM agent_events {sh_where}",
-            params,
-        ).fetchone()["total"]
+        totals = dict(db.execute(
+            f"SELECT metric, SUM(value) FROM dashboard_counters {where} GROUP BY metric",
+            (studio_id,) if studio_id else (),
+        ).fetchall())
+
+    found_money = totals.get("found_money", 0)
+    ai_chats = int(totals.get("ai_chats", 0))
+    approved = int(totals.get("leads_approved", 0))
+    declined = int(totals.get("leads_filtered", 0))
+    gap_fills = int(totals.get("gap_fills", 0))
+    social_leads_found = int(totals.get("social_leads_found", 0))
 
     return {
         "found_money": round(found_money, 2),
@@ -0,0 +1,61 @@
+"""
+Beauty OS — Background Jobs
+
+Runs long agent work (upsell cycle, Social Hunter scans) as asyncio tasks
+on the API's event loop, so the triggering request returns a job id right
+away instead of holding a worker for the whole run. Job status and results
+are kept in memory for an hour after they finish, for polling.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+from backend.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+JOB_RESULT_TTL = 3600  # seconds
+
+_jobs = TTLCache(maxsize=1024, ttl=JOB_RESULT_TTL)
+_running: set[asyncio.Task] = set()  # the loop only holds weak refs to tasks
+
+
+def start_job(kind: str, studio_id: str, run: Callable[[], Awaitable[dict]]) -> dict:
+    """Schedule `run()` on the running event loop and return the new job record."""
+    job = {
+        "job_id": str(uuid.uuid4()),
+        "kind": kind,
+        "studio_id": studio_id,
+        "status": "queued",
+        "result": None,
+        "error": None,
+        "created_at": time.time(),
+    }
+    _jobs.set(job["job_id"], job)
+    task = asyncio.get_running_loop().create_task(_run_job(job, run))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+    return dict(job)
+
+
+def get_job(job_id: str) -> dict | None:
+    job = _jobs.get(job_id)
+    return dict(job) if job else None
+
+
+async def _run_job(job: dict, run: Callable[[], Awaitable[dict]]):
+    job["status"] = "running"
+    try:
+        result = await run()
+    except Exception as e:
+        job.update(status="failed", error=str(e))
+        logger.exception("%s job %s failed", job["kind"], job["job_id"][:8])
+    else:
+        if isinstance(result, dict) and "error" in result:
+            job.update(status="failed", error=result["error"], result=result)
+        else:
+            job.update(status="done", result=result)
+    _jobs.set(job["job_id"], job)  # TTL counts from completion
@@ -0,0 +1,32 @@
+"""
+Beauty OS — Logging Setup
+
+Log records are handed to a QueueHandler and written to stderr by a
+QueueListener thread, so agent threads never block on console I/O.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def configure_logging(level: int = logging.INFO):
+    """Install the queue-backed root handler. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -0,0 +1,49 @@
+"""
+Beauty OS — Rate Limiting
+
+A thread-safe token bucket for pacing calls to quota-policed APIs
+(Twilio sends, Google Places, Reddit search) just under their limits,
+instead of bursting into 429s and backing off.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. `acquire()` blocks until a token is available.
+
+    capacity: max tokens held (burst size).
+    refill_rate_per_sec: tokens added per second (sustained rate).
+    """
+
+    def __init__(self, capacity: float, refill_rate_per_sec: float):
+        self.capacity = capacity
+        self.refill_rate_per_sec = refill_rate_per_sec
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._last) * self.refill_rate_per_sec,
+        )
+        self._last = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.refill_rate_per_sec
+            time.sleep(max(0.0, wait))
+
+    def penalize(self):
+        """Drop a second's worth of tokens after a 429 so callers slow down."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= self.refill_rate_per_sec
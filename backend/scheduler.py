@@ -4,20 +4,26 @@ Beauty OS — Scheduled Tasks
 Runs periodic tasks:
 - Every hour: check for bookings in the upsell window and send SMS.
 - Every 2 hours: run Social Hunter scan for all studios.
+- Every 15 minutes: delete expired / used magic link tokens.
 - Designed to run as a standalone process or via cron/task scheduler.
 """
 
 import time
+import asyncio
 import schedule
-from backend.database import init_db
+from backend.database import init_db, cleanup_expired_tokens
+from backend.logging_config import configure_logging
 from backend.agents.revenue_engine import process_upsell_window
 from backend.agents.social_hunter import run_social_hunter_all_studios
 
+# Upper bound on one sleep, so clock jumps and newly added jobs are noticed
+_MAX_IDLE_SLEEP = 300  # seconds
+
 
 def run_upsell_check():
     """Process the upsell window — find upcoming bookings and send offers."""
     print(f"[Scheduler] Running upsell check...")
-    results = process_upsell_window()
+    results = asyncio.run(process_upsell_window())
     print(f"[Scheduler] Sent {len(results)} upsell(s).")
     for r in results:
         print(f"  - {r['client_name']}: {r['addon_offered']} (${r['addon_price']})")
@@ -36,12 +42,21 @@ def run_social_hunter_scan():
     print(f"[Scheduler] Social Hunter scan complete. {len(results)} scan(s) processed.")
 
 
+def run_token_cleanup():
+    """Delete expired and used magic link tokens."""
+    deleted = cleanup_expired_tokens()
+    if deleted:
+        print(f"[Scheduler] Removed {deleted} expired magic link token(s).")
+
+
 def main():
     """Start the scheduler loop."""
+    configure_logging()
     init_db()
     print("[Scheduler] Beauty OS scheduler started.")
     print("[Scheduler] Upsell check runs every hour.")
     print("[Scheduler] Social Hunter scan (Reddit + Google Maps) runs every 2 hours.")
+    print("[Scheduler] Magic link token cleanup runs every 15 minutes.")
 
     # Run immediately on start, then on schedule
     run_upsell_check()
@@ -50,9 +65,13 @@ def main():
     run_social_hunter_scan()
     schedule.every(2).hours.do(run_social_hunter_scan)
 
+    schedule.every(15).minutes.do(run_token_cleanup)
+
     while True:
         schedule.run_pending()
-        time.sleep(60)
+        # Sleep until the next job is due rather than polling on a fixed tick
+        idle = schedule.idle_seconds()
+        time.sleep(min(max(idle, 0), _MAX_IDLE_SLEEP) if idle is not None else _MAX_IDLE_SLEEP)
 
 
 if __name__ == "__main__":
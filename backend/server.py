@@ -4,8 +4,16 @@ Beauty OS — FastAPI Server (Multi-Tenant)
 Central API that connects all agents, webhooks, onboarding, and the dashboard.
 """
 
-from fastapi import FastAPI, Request, HTTPException, Depends
+import asyncio
+import hashlib
+import hmac
+import logging
+
+import orjson
+from fastapi import FastAPI, Request, HTTPException, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from typing import Optional, List
 
@@ -32,41 +40,56 @@ from backend.database import (
     cleanup_expired_tokens,
     get_social_leads,
 )
+from backend.logging_config import configure_logging
 from backend.auth import get_current_studio, get_optional_studio
-from backend.studio_config import get_studio_config, BRAND_VOICE_PROMPTS
+from backend.jobs import start_job, get_job
+from backend.studio_config import get_studio_config, invalidate_studio_config, BRAND_VOICE_PROMPTS
 from backend.services.email import send_magic_link
 from backend.agents.vibe_check import evaluate_lead, evaluate_policy_confirmation
 from backend.agents.revenue_engine import process_upsell_window, handle_upsell_reply
 from backend.agents.gap_filler import handle_cancellation, handle_gap_fill_reply
 from backend.agents.social_hunter import run_social_hunter, run_google_maps_hunter, approve_and_reply, dismiss_lead
+from config.settings import IG_APP_SECRET, IG_VERIFY_TOKEN, TWILIO_AUTH_TOKEN
+
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Beauty OS", version="2.0.0", default_response_class=ORJSONResponse)
 
-app = FastAPI(title="Beauty OS", version="2.0.0")
+# Allow the React dashboard to connect. A frozenset, since CORSMiddleware
+# checks each request's Origin with `in`.
+_ALLOWED_ORIGINS = frozenset({
+    "http://localhost:3000",
+    "http://localhost:5173",
+    "https://beauty-os.vercel.app",
+    "https://web-production-8369d9.up.railway.app",
+})
 
-# Allow the React dashboard to connect
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://localhost:5173",
-        "https://beauty-os.vercel.app",
-        "https://web-production-8369d9.up.railway.app",
-    ],
+    allow_origins=_ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Dashboard / leads / events JSON compresses well; tiny webhook acks stay under the threshold
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
 @app.on_event("startup")
 def startup():
+    configure_logging()
     init_db()
     cleanup_expired_tokens()
 
 
+# Handlers that do no blocking I/O are `async def` so they run on the event
+# loop; anything touching SQLite, the LLM, or an SDK stays `def` (threadpool).
+
 # ── Health Check ─────────────────────────────────────────────────────
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok", "service": "beauty-os"}
 
 
@@ -84,7 +107,7 @@ class VerifyTokenRequest(BaseModel):
 
 
 @app.post("/api/auth/send-magic-link")
-def send_magic_link_endpoint(req: MagicLinkRequest):
+def send_magic_link_endpoint(req: MagicLinkRequest, background_tasks: BackgroundTasks):
     """Send a magic link email to the studio owner."""
     email = req.email.strip().lower()
     if not email:
@@ -96,16 +119,15 @@ def send_magic_link_endpoint(req: MagicLinkRequest):
         return {"sent": True}
 
     token = create_magic_token(studio["id"])
-    result = send_magic_link(
-        to_email=email,
-        token=token,
-        studio_name=studio["name"],
-    )
+    # Sent after the response so the request doesn't wait on Resend
+    background_tasks.add_task(_send_magic_link_email, email, token, studio["name"])
+    return {"sent": True}
 
-    if not result["sent"]:
-        raise HTTPException(500, "Failed to send email. Please try again.")
 
-    return {"sent": True}
+def _send_magic_link_email(email: str, token: str, studio_name: str):
+    result = send_magic_link(to_email=email, token=token, studio_name=studio_name)
+    if not result["sent"]:
+        logger.warning("Failed to send magic link to %s: %s", email, result.get("error"))
 
 
 @app.post("/api/auth/verify-magic-link")
@@ -188,6 +210,7 @@ def add_service(req: AddServiceRequest, studio: dict = Depends(get_current_studi
         price=req.price,
         duration_min=req.duration_min,
     )
+    invalidate_studio_config(studio["id"])
     return {"id": service_id, "name": req.name, "price": req.price, "duration_min": req.duration_min}
 
 
@@ -200,8 +223,9 @@ def list_services(studio: dict = Depends(get_current_studio)):
 @app.put("/api/onboarding/services/{service_id}")
 def edit_service(service_id: str, req: UpdateServiceRequest, studio: dict = Depends(get_current_studio)):
     """Update a service."""
-    updates = {k: v for k, v in req.model_dump().items() if v is not None}
+    updates = req.model_dump(exclude_none=True)
     update_service(service_id, **updates)
+    invalidate_studio_config(studio["id"])
     return {"updated": True}
 
 
@@ -209,6 +233,7 @@ def edit_service(service_id: str, req: UpdateServiceRequest, studio: dict = Depe
 def remove_service(service_id: str, studio: dict = Depends(get_current_studio)):
     """Delete a service and its add-ons."""
     delete_service(service_id)
+    invalidate_studio_config(studio["id"])
     return {"deleted": True}
 
 
@@ -240,6 +265,7 @@ def add_addon(req: AddAddonRequest, studio: dict = Depends(get_current_studio)):
         duration_min=req.duration_min,
         pitch=req.pitch.strip(),
     )
+    invalidate_studio_config(studio["id"])
     return {"id": addon_id, "name": req.name, "price": req.price}
 
 
@@ -252,8 +278,9 @@ def list_addons(service_id: str, studio: dict = Depends(get_current_studio)):
 @app.put("/api/onboarding/addons/{addon_id}")
 def edit_addon(addon_id: str, req: UpdateAddonRequest, studio: dict = Depends(get_current_studio)):
     """Update an add-on."""
-    updates = {k: v for k, v in req.model_dump().items() if v is not None}
+    updates = req.model_dump(exclude_none=True)
     update_addon(addon_id, **updates)
+    invalidate_studio_config(studio["id"])
     return {"updated": True}
 
 
@@ -261,6 +288,7 @@ def edit_addon(addon_id: str, req: UpdateAddonRequest, studio: dict = Depends(ge
 def remove_addon(addon_id: str, studio: dict = Depends(get_current_studio)):
     """Delete an add-on."""
     delete_addon(addon_id)
+    invalidate_studio_config(studio["id"])
     return {"deleted": True}
 
 
@@ -277,13 +305,14 @@ class PoliciesRequest(BaseModel):
 @app.put("/api/onboarding/policies")
 def set_policies(req: PoliciesRequest, studio: dict = Depends(get_current_studio)):
     """Update studio policies."""
-    updates = {k: v for k, v in req.model_dump().items() if v is not None}
+    updates = req.model_dump(exclude_none=True)
     update_studio(studio["id"], **updates)
+    invalidate_studio_config(studio["id"])
     return {"updated": True}
 
 
 @app.get("/api/onboarding/policies")
-def get_policies(studio: dict = Depends(get_current_studio)):
+async def get_policies(studio: dict = Depends(get_current_studio)):
     """Get current studio policies."""
     return {
         "deposit_amount": studio["deposit_amount"],
@@ -300,21 +329,27 @@ class BrandVoiceRequest(BaseModel):
     brand_voice: str  # "professional_chill" | "warm_bubbly" | "luxury_exclusive"
 
 
+# BRAND_VOICE_PROMPTS is static, so the listing is built once at import
+_BRAND_VOICE_LISTING = tuple(
+    {"key": key, "label": val["label"], "personality": val["personality"][:100] + "..."}
+    for key, val in BRAND_VOICE_PROMPTS.items()
+)
+_INVALID_VOICE_DETAIL = f"Invalid voice. Choose from: {list(BRAND_VOICE_PROMPTS)}"
+
+
 @app.get("/api/onboarding/brand-voices")
-def list_brand_voices():
+async def list_brand_voices():
     """Return available brand voice presets."""
-    return [
-        {"key": key, "label": val["label"], "personality": val["personality"][:100] + "..."}
-        for key, val in BRAND_VOICE_PROMPTS.items()
-    ]
+    return _BRAND_VOICE_LISTING
 
 
 @app.put("/api/onboarding/brand-voice")
 def set_brand_voice(req: BrandVoiceRequest, studio: dict = Depends(get_current_studio)):
     """Set the studio's brand voice."""
     if req.brand_voice not in BRAND_VOICE_PROMPTS:
-        raise HTTPException(400, f"Invalid voice. Choose from: {list(BRAND_VOICE_PROMPTS.keys())}")
+        raise HTTPException(400, _INVALID_VOICE_DETAIL)
     update_studio(studio["id"], brand_voice=req.brand_voice)
+    invalidate_studio_config(studio["id"])
     return {"updated": True, "brand_voice": req.brand_voice}
 
 
@@ -324,6 +359,7 @@ def set_brand_voice(req: BrandVoiceRequest, studio: dict = Depends(get_current_s
 def complete_onboarding(studio: dict = Depends(get_current_studio)):
     """Mark onboarding as complete."""
     update_studio(studio["id"], onboarding_complete=1)
+    invalidate_studio_config(studio["id"])
     return {"onboarding_complete": True, "slug": studio["slug"]}
 
 
@@ -377,24 +413,30 @@ def run_demo(req: DemoRequest, studio: dict = Depends(get_current_studio)):
 
 # ── Dashboard Metrics ────────────────────────────────────────────────
 
+async def _dashboard_payload(studio_id: str) -> dict:
+    """Metrics and the recent-events feed, read concurrently on pooled connections."""
+    metrics, events = await asyncio.gather(
+        asyncio.to_thread(get_dashboard_metrics, studio_id),
+        asyncio.to_thread(get_recent_events, studio_id, limit=20),
+    )
+    metrics["recent_events"] = events
+    return metrics
+
+
 @app.get("/api/dashboard")
-def dashboard(studio: dict = Depends(get_optional_studio)):
+async def dashboard(studio: dict = Depends(get_optional_studio)):
     """Return aggregated metrics for the owner dashboard."""
     studio_id = studio["id"] if studio else ""
-    metrics = get_dashboard_metrics(studio_id)
-    metrics["recent_events"] = get_recent_events(studio_id, limit=20)
-    return metrics
+    return await _dashboard_payload(studio_id)
 
 
 @app.get("/api/dashboard/{slug}")
-def dashboard_by_slug(slug: str):
+async def dashboard_by_slug(slug: str):
     """Return dashboard metrics for a specific studio by slug."""
-    studio = get_studio_by_slug(slug)
+    studio = await asyncio.to_thread(get_studio_by_slug, slug)
     if not studio:
         raise HTTPException(404, "Studio not found")
-    metrics = get_dashboard_metrics(studio["id"])
-    metrics["recent_events"] = get_recent_events(studio["id"], limit=20)
-    return metrics
+    return await _dashboard_payload(studio["id"])
 
 
 @app.get("/api/dashboard/{slug}/events")
@@ -451,12 +493,17 @@ class UpsellReply(BaseModel):
     reply_text: str
 
 
-@app.post("/api/upsell/process")
-def run_upsell_cycle(studio: dict = Depends(get_optional_studio)):
-    """Trigger the upsell cycle manually."""
+@app.post("/api/upsell/process", status_code=202)
+async def run_upsell_cycle(studio: dict = Depends(get_optional_studio)):
+    """Trigger the upsell cycle manually. Runs in the background; poll /api/jobs/{job_id}."""
     studio_id = studio["id"] if studio else ""
-    results = process_upsell_window(studio_id=studio_id)
-    return {"upsells_sent": len(results), "details": results}
+
+    async def run():
+        results = await process_upsell_window(studio_id=studio_id)
+        return {"upsells_sent": len(results), "details": results}
+
+    job = start_job("upsell", studio_id, run)
+    return {"job_id": job["job_id"], "status": job["status"]}
 
 
 @app.post("/api/upsell/reply")
@@ -553,21 +600,20 @@ def dismiss_social_lead(lead_id: str, studio: dict = Depends(get_current_studio)
     return result
 
 
-@app.post("/api/social-hunter/run")
-def trigger_social_hunter(
+@app.post("/api/social-hunter/run", status_code=202)
+async def trigger_social_hunter(
     req: SocialHunterRunRequest,
     studio: dict = Depends(get_current_studio),
 ):
-    """Manually trigger a Social Hunter scan for this studio."""
-    result = run_social_hunter(
+    """Manually trigger a Social Hunter scan for this studio. Poll /api/jobs/{job_id}."""
+    job = start_job("social_hunter", studio["id"], lambda: asyncio.to_thread(
+        run_social_hunter,
         studio_id=studio["id"],
         dry_run=req.dry_run,
         subreddits=req.subreddits,
         keywords=req.keywords,
-    )
-    if "error" in result:
-        raise HTTPException(400, result["error"])
-    return result
+    ))
+    return {"job_id": job["job_id"], "status": job["status"]}
 
 
 class GoogleMapsHunterRunRequest(BaseModel):
@@ -575,31 +621,60 @@ class GoogleMapsHunterRunRequest(BaseModel):
     business_types: Optional[List[str]] = None
 
 
-@app.post("/api/social-hunter/run-gmaps")
-def trigger_google_maps_hunter(
+@app.post("/api/social-hunter/run-gmaps", status_code=202)
+async def trigger_google_maps_hunter(
     req: GoogleMapsHunterRunRequest,
     studio: dict = Depends(get_current_studio),
 ):
-    """Manually trigger a Google Maps competitor review scan for this studio."""
-    result = run_google_maps_hunter(
+    """Manually trigger a Google Maps competitor review scan for this studio. Poll /api/jobs/{job_id}."""
+    job = start_job("google_maps_hunter", studio["id"], lambda: asyncio.to_thread(
+        run_google_maps_hunter,
         studio_id=studio["id"],
         max_rating=req.max_rating,
         business_types=req.business_types,
-    )
-    if "error" in result:
-        raise HTTPException(400, result["error"])
-    return result
+    ))
+    return {"job_id": job["job_id"], "status": job["status"]}
+
+
+# ── Background Jobs ──────────────────────────────────────────────────
+
+@app.get("/api/jobs/{job_id}")
+def job_status(job_id: str, studio: dict = Depends(get_optional_studio)):
+    """Status of a background job: queued | running | done | failed, with its result."""
+    job = get_job(job_id)
+    if not job or job["studio_id"] != (studio["id"] if studio else ""):
+        raise HTTPException(404, "Job not found")
+    return job
 
 
 # ── Twilio Inbound SMS Webhook ───────────────────────────────────────
 
+def _twilio_validator():
+    if not TWILIO_AUTH_TOKEN:
+        return None
+    from twilio.request_validator import RequestValidator
+    return RequestValidator(TWILIO_AUTH_TOKEN)
+
+
+_twilio_request_validator = _twilio_validator()
+
+
 @app.post("/webhooks/twilio/inbound")
 async def twilio_inbound(request: Request):
     """
     Twilio sends POST requests here when an SMS is received.
     Route the reply to the correct agent based on context.
     """
+    signature = request.headers.get("X-Twilio-Signature", "")
+    # Unsigned requests are turned away before the body is read or parsed
+    if _twilio_request_validator and not signature:
+        raise HTTPException(status_code=403, detail="Missing signature")
     form = await request.form()
+    if _twilio_request_validator:
+        # Twilio signs the public URL; behind a proxy the scheme comes from X-Forwarded-Proto
+        url = request.url.replace(scheme=request.headers.get("X-Forwarded-Proto", request.url.scheme))
+        if not _twilio_request_validator.validate(str(url), dict(form), signature):
+            raise HTTPException(status_code=403, detail="Invalid signature")
     from_number = form.get("From", "")
     body = form.get("Body", "")
     return {"received": True, "from": from_number, "body": body}
@@ -607,31 +682,51 @@ async def twilio_inbound(request: Request):
 
 # ── Instagram Webhook ────────────────────────────────────────────────
 
+# Keyed once; each request copies the precomputed inner/outer digest state
+_ig_signature_hmac = hmac.new(IG_APP_SECRET.encode(), digestmod=hashlib.sha256) if IG_APP_SECRET else None
+
+
+def _valid_instagram_signature(body: bytes, header: str) -> bool:
+    """Check Meta's X-Hub-Signature-256 header ("sha256=<hex>") against the raw body."""
+    if _ig_signature_hmac is None:
+        return True  # IG_APP_SECRET not configured
+    mac = _ig_signature_hmac.copy()
+    mac.update(body)
+    return hmac.compare_digest(f"sha256={mac.hexdigest()}", header)
+
+
 @app.post("/webhooks/instagram")
 async def instagram_webhook(request: Request):
     """Instagram sends webhook events here for new DMs."""
-    payload = await request.json()
-    entries = payload.get("entry", [])
-    for entry in entries:
-        messaging = entry.get("messaging", [])
-        for msg_event in messaging:
-            sender_id = msg_event.get("sender", {}).get("id", "")
-            message_text = msg_event.get("message", {}).get("text", "")
-            if message_text:
-                result = evaluate_lead(
-                    message=message_text,
-                    sender_name="Instagram User",
-                    sender_ig=sender_id,
-                )
+    body = await request.body()
+    if not _valid_instagram_signature(body, request.headers.get("X-Hub-Signature-256", "")):
+        raise HTTPException(status_code=403, detail="Invalid signature")
+    payload = orjson.loads(body)
+    messages = [
+        (msg_event.get("sender", {}).get("id", ""), msg_event["message"]["text"])
+        for entry in payload.get("entry", [])
+        for msg_event in entry.get("messaging", [])
+        if msg_event.get("message", {}).get("text")
+    ]
+    # Meta batches DMs per POST; evaluate them concurrently off the event loop
+    results = await asyncio.gather(*(
+        asyncio.to_thread(evaluate_lead, message=text, sender_name="Instagram User", sender_ig=sender_id)
+        for sender_id, text in messages
+    ), return_exceptions=True)
+    for (sender_id, _), result in zip(messages, results):
+        if isinstance(result, Exception):
+            logger.error("Failed to evaluate DM from %s: %s", sender_id, result, exc_info=result)
     return {"status": "ok"}
 
 
 @app.get("/webhooks/instagram")
 async def instagram_webhook_verify(request: Request):
     """Instagram webhook verification (GET request)."""
-    mode = request.query_params.get("hub.mode")
-    token = request.query_params.get("hub.verify_token")
-    challenge = request.query_params.get("hub.challenge")
-    if mode == "subscribe" and token:
-        return int(challenge)
+    params = request.query_params
+    token = params.get("hub.verify_token", "")
+    # Without IG_VERIFY_TOKEN configured, any non-empty token is accepted
+    token_ok = hmac.compare_digest(token, IG_VERIFY_TOKEN) if IG_VERIFY_TOKEN else bool(token)
+    if params.get("hub.mode") == "subscribe" and token_ok:
+        # Echo the challenge verbatim; Meta compares it as text
+        return PlainTextResponse(params.get("hub.challenge", ""))
     raise HTTPException(status_code=403, detail="Verification failed")
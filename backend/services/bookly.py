@@ -5,15 +5,25 @@ Communicates with the Bookly PRO WordPress plugin via its REST API
 to create/update/cancel appointments.
 """
 
+import logging
+
 import requests
+from requests.adapters import HTTPAdapter
 from config.settings import BOOKLY_API_URL, BOOKLY_API_KEY
 
+logger = logging.getLogger(__name__)
 
-def _headers():
-    return {
-        "Authorization": f"Bearer {BOOKLY_API_KEY}",
-        "Content-Type": "application/json",
-    }
+_TIMEOUT = 10  # seconds
+
+# One keep-alive session for all Bookly calls, so only the first request
+# to the WordPress host pays the TCP + TLS handshake
+_session = requests.Session()
+_session.headers.update({
+    "Authorization": f"Bearer {BOOKLY_API_KEY}",
+    "Content-Type": "application/json",
+})
+_session.mount("https://", HTTPAdapter(pool_maxsize=20))
+_session.mount("http://", HTTPAdapter(pool_maxsize=20))
 
 
 def get_available_slots(service_id: str, date: str) -> list[dict]:
@@ -23,7 +33,7 @@ def get_available_slots(service_id: str, date: str) -> list[dict]:
     """
     url = f"{BOOKLY_API_URL}/slots"
     params = {"service_id": service_id, "date": date}
-    resp = requests.get(url, headers=_headers(), params=params)
+    resp = _session.get(url, timeout=_TIMEOUT, params=params)
     resp.raise_for_status()
     return resp.json()
 
@@ -51,7 +61,7 @@ def create_appointment(
         "staff_id": staff_id,
         "datetime": datetime_slot,
     }
-    resp = requests.post(url, headers=_headers(), json=payload)
+    resp = _session.post(url, timeout=_TIMEOUT, json=payload)
     resp.raise_for_status()
     return resp.json()
 
@@ -67,7 +77,7 @@ def update_appointment_price(appointment_id: str, new_price: float, add_ons: lis
             "adjusted_price": new_price,
         },
     }
-    resp = requests.patch(url, headers=_headers(), json=payload)
+    resp = _session.patch(url, timeout=_TIMEOUT, json=payload)
     resp.raise_for_status()
     return resp.json()
 
@@ -76,7 +86,7 @@ def cancel_appointment(appointment_id: str) -> dict:
     """Cancel an appointment in Bookly PRO."""
     url = f"{BOOKLY_API_URL}/appointments/{appointment_id}"
     payload = {"status": "cancelled"}
-    resp = requests.patch(url, headers=_headers(), json=payload)
+    resp = _session.patch(url, timeout=_TIMEOUT, json=payload)
     resp.raise_for_status()
     return resp.json()
 
@@ -84,10 +94,10 @@ def cancel_appointment(appointment_id: str) -> dict:
 # ── Dry-run versions for testing ─────────────────────────────────────
 
 def create_appointment_dry_run(**kwargs) -> dict:
-    print(f"[DRY RUN BOOKLY] Create appointment: {kwargs}")
+    logger.debug("[DRY RUN BOOKLY] Create appointment: %s", kwargs)
     return {"id": "dry_run_appt_001", **kwargs}
 
 
 def update_appointment_price_dry_run(appointment_id: str, new_price: float, add_ons: list) -> dict:
-    print(f"[DRY RUN BOOKLY] Update {appointment_id}: price={new_price}, add_ons={add_ons}")
+    logger.debug("[DRY RUN BOOKLY] Update %s: price=%s, add_ons=%s", appointment_id, new_price, add_ons)
     return {"id": appointment_id, "price": new_price}
@@ -6,17 +6,64 @@ their negative reviews using the Google Places API (New).
 Free tier: $200/month credit (~40,000 place detail requests).
 """
 
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from backend.cache import TTLCache
+from backend.ratelimit import TokenBucket
 from config.settings import (
     GOOGLE_MAPS_API_KEY,
     GOOGLE_MAPS_SEARCH_RADIUS,
     GOOGLE_MAPS_BUSINESS_TYPES,
 )
 
+logger = logging.getLogger(__name__)
+
 PLACES_SEARCH_URL = "https://places.googleapis.com/v1/places:searchNearby"
 PLACE_DETAILS_URL = "https://places.googleapis.com/v1/places/{place_id}"
 GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
 
+_DETAILS_WORKERS = 8  # concurrent Place Details requests per search
+# Just the review fields read below; bare "reviews" also returns author
+# photo/profile URIs, originalText and translation metadata.
+_REVIEW_FIELD_MASK = (
+    "reviews.authorAttribution.displayName,reviews.rating,reviews.text,"
+    "reviews.publishTime,reviews.relativePublishTimeDescription"
+)
+_HIGH_RATED_MIN_RATINGS = 50  # ratings needed before a high average is trusted
+
+# Nearby-search results by rounded center (~11 m) + filters, so studios
+# scanning the same area within the hour share one billed search.
+_search_cache = TTLCache(maxsize=256, ttl=3600)
+
+# Shared keep-alive session: a scan's geocode, search and detail calls reuse
+# pooled TLS connections. Transient 429/5xx responses are retried with backoff
+# (honouring Retry-After); searchNearby is a read, so POST is retried too.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}),
+        raise_on_status=False,
+    ),
+))
+
+# Paces calls under the Places API's default 600 requests/minute quota so a
+# scan's detail fan-out queues briefly rather than tripping 429s; a 429 that
+# survives the retries above drains the bucket to slow later calls down.
+_rate_limiter = TokenBucket(capacity=20, refill_rate_per_sec=10)
+_session.hooks["response"].append(
+    lambda resp, *args, **kwargs: _rate_limiter.penalize() if resp.status_code == 429 else None
+)
+
 
 # ── Geocoding ────────────────────────────────────────────────────────
 
@@ -31,11 +78,12 @@ def geocode_location(location: str) -> dict | None:
         {"lat": float, "lng": float} or None if geocoding fails.
     """
     if not GOOGLE_MAPS_API_KEY:
-        print("[Google Maps] GOOGLE_MAPS_API_KEY not configured -- skipping.")
+        logger.info("GOOGLE_MAPS_API_KEY not configured -- skipping.")
         return None
 
     try:
-        resp = requests.get(GEOCODE_URL, params={
+        _rate_limiter.acquire()
+        resp = _session.get(GEOCODE_URL, params={
             "address": location,
             "key": GOOGLE_MAPS_API_KEY,
         }, timeout=10)
@@ -46,7 +94,7 @@ def geocode_location(location: str) -> dict | None:
             return {"lat": geo["lat"], "lng": geo["lng"]}
         return None
     except Exception as e:
-        print(f"[Google Maps] Geocode error for '{location}': {e}")
+        logger.warning("Geocode error for %r: %s", location, e)
         return None
 
 
@@ -72,12 +120,17 @@ def search_nearby_businesses(
         List of dicts: {"place_id", "name", "address", "rating", "user_ratings_total"}
     """
     if not GOOGLE_MAPS_API_KEY:
-        print("[Google Maps] GOOGLE_MAPS_API_KEY not configured -- skipping.")
+        logger.info("GOOGLE_MAPS_API_KEY not configured -- skipping.")
         return []
 
     types = business_types or GOOGLE_MAPS_BUSINESS_TYPES
     search_radius = radius or GOOGLE_MAPS_SEARCH_RADIUS
 
+    cache_key = (round(lat, 4), round(lng, 4), tuple(types), search_radius, max_results)
+    cached = _search_cache.get(cache_key)
+    if cached is not None:
+        return list(cached)
+
     headers = {
         "Content-Type": "application/json",
         "X-Goog-Api-Key": GOOGLE_MAPS_API_KEY,
@@ -96,11 +149,12 @@ def search_nearby_businesses(
     }
 
     try:
-        resp = requests.post(PLACES_SEARCH_URL, json=body, headers=headers, timeout=15)
+        _rate_limiter.acquire()
+        resp = _session.post(PLACES_SEARCH_URL, json=body, headers=headers, timeout=15)
         resp.raise_for_status()
         data = resp.json()
     except Exception as e:
-        print(f"[Google Maps] Nearby search error: {e}")
+        logger.warning("Nearby search error: %s", e)
         return []
 
     results = []
@@ -113,7 +167,8 @@ def search_nearby_businesses(
             "user_ratings_total": place.get("userRatingCount", 0),
         })
 
-    return results
+    _search_cache.set(cache_key, results)
+    return list(results)
 
 
 # ── Place Reviews ────────────────────────────────────────────────────
@@ -136,15 +191,16 @@ def get_place_reviews(place_id: str) -> list[dict]:
     headers = {
         "Content-Type": "application/json",
         "X-Goog-Api-Key": GOOGLE_MAPS_API_KEY,
-        "X-Goog-FieldMask": "reviews",
+        "X-Goog-FieldMask": _REVIEW_FIELD_MASK,
     }
 
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
+        _rate_limiter.acquire()
+        resp = _session.get(url, headers=headers, timeout=10)
         resp.raise_for_status()
         data = resp.json()
     except Exception as e:
-        print(f"[Google Maps] Place details error for {place_id}: {e}")
+        logger.warning("Place details error for %s: %s", place_id, e)
         return []
 
     reviews = []
@@ -160,6 +216,16 @@ def get_place_reviews(place_id: str) -> list[dict]:
     return reviews
 
 
+def _review_id(place_id: str, author: str, rating) -> str:
+    """
+    Synthesize a fixed-length review ID for dedup. The author's name is
+    hashed so it doesn't end up in logs; database migrations rewrite
+    older plain-text IDs with the same recipe.
+    """
+    key = f"{place_id}_{author}_{rating}"
+    return "gmaps_" + hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
 # ── Main Entry Point ─────────────────────────────────────────────────
 
 def get_negative_reviews(
@@ -168,15 +234,23 @@ def get_negative_reviews(
     max_rating: int = 2,
     exclude_place_name: str = "",
     business_types: list[str] | None = None,
+    skip_high_rated_threshold: float = 4.7,
 ) -> list[dict]:
     """
     Main entry point: find competing businesses and return their negative reviews.
 
+    Place Details is a billed call per business, so places that can't yield a
+    match are skipped up front: those with no ratings, and those averaging at
+    least `skip_high_rated_threshold` over 50+ ratings. The latter is an
+    approximation -- such a place can still have a 1-2 star review among its
+    latest five, but rarely enough that the saved calls are worth the miss.
+
     Args:
         lat, lng: Center of search.
         max_rating: Include reviews with this rating or lower (1-2 stars).
         exclude_place_name: Skip this business (the studio itself).
         business_types: Override business types to search.
+        skip_high_rated_threshold: Skip well-reviewed places at or above this rating.
 
     Returns:
         List of dicts with review info + place context:
@@ -190,17 +264,30 @@ def get_negative_reviews(
         lat=lat, lng=lng, business_types=business_types,
     )
 
-    all_negative = []
-    for biz in businesses:
-        # Skip the studio's own listing
-        if exclude_place_name and exclude_place_name.lower() in biz["name"].lower():
-            continue
+    # Skip the studio's own listing
+    if exclude_place_name:
+        exclude_lc = exclude_place_name.lower()
+        businesses = [b for b in businesses if exclude_lc not in b["name"].lower()]
+
+    # Skip places with nothing to fetch or too well rated to have bad reviews
+    businesses = [
+        b for b in businesses
+        if b["user_ratings_total"]
+        and not (b["rating"] >= skip_high_rated_threshold
+                 and b["user_ratings_total"] >= _HIGH_RATED_MIN_RATINGS)
+    ]
+    if not businesses:
+        return []
 
-        reviews = get_place_reviews(biz["place_id"])
+    # Fetch place details concurrently; results keep search order
+    with ThreadPoolExecutor(max_workers=min(_DETAILS_WORKERS, len(businesses))) as ex:
+        reviews_by_place = list(ex.map(lambda biz: get_place_reviews(biz["place_id"]), businesses))
+
+    all_negative = []
+    for biz, reviews in zip(businesses, reviews_by_place):
         for review in reviews:
             if review["rating"] <= max_rating and review["text"].strip():
-                # Synthesize a unique review ID for dedup
-                review_id = f"gmaps_{biz['place_id']}_{review['author']}_{review['rating']}"
+                review_id = _review_id(biz["place_id"], review["author"], review["rating"])
                 all_negative.append({
                     "place_id": biz["place_id"],
                     "place_name": biz["name"],
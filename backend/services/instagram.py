@@ -4,9 +4,13 @@ Beauty OS — Instagram Graph API Service
 Handles reading DMs and sending replies via the Instagram Graph API.
 """
 
+import logging
+
 import requests
 from config.settings import IG_ACCESS_TOKEN, IG_PAGE_ID
 
+logger = logging.getLogger(__name__)
+
 BASE_URL = "https://graph.facebook.com/v18.0"
 
 
@@ -28,6 +32,5 @@ def send_dm_reply(recipient_id: str, message_text: str) -> dict:
 
 def send_dm_reply_dry_run(recipient_id: str, message_text: str) -> dict:
     """Simulate sending an IG DM (for testing without credentials)."""
-    print(f"[DRY RUN IG DM] To: {recipient_id}")
-    print(f"[DRY RUN IG DM] Message: {message_text}")
+    logger.info("[DRY RUN IG DM] To: %s, message: %s", recipient_id, message_text)
     return {"recipient_id": recipient_id, "message": message_text}
@@ -4,86 +4,238 @@ Beauty OS — LLM Service
 Unified interface for Gemini (Google), Claude (Anthropic), or GPT (OpenAI).
 """
 
-import json
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+
+import orjson
+
 from config.settings import (
     LLM_PROVIDER,
     ANTHROPIC_API_KEY,
     OPENAI_API_KEY,
     GEMINI_API_KEY,
     LLM_MODEL,
+    LLM_MAX_CONCURRENCY,
 )
 
+# Process-wide cap on in-flight LLM requests, shared by every thread pool
+# that fans out LLM work (per-scan evaluation, per-studio scans, upsells).
+_llm_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+
+# Opening ```/```json fence line and closing fence around a JSON reply
+_FENCE_RE = re.compile(r"\A```[\w-]*[ \t]*\n?|\n?```\s*\Z")
+
 
-def call_llm(system_prompt: str, user_message: str) -> str:
+def call_llm(
+    system_prompt: str | list[str],
+    user_message: str,
+    cache_key: str = "",
+    model: str = "",
+    json_schema: dict | None = None,
+) -> str:
     """
     Send a message to the configured LLM and return the text response.
     Raises RuntimeError if the provider is misconfigured.
+
+    `system_prompt` may be a list of blocks ordered most-stable first; each
+    block is marked cacheable for providers with prompt caching, and the
+    blocks are joined for providers without block support.
+    `cache_key` groups requests sharing a prefix (e.g. one studio's scan)
+    so OpenAI routes them to the same cache. `model` overrides LLM_MODEL.
+    `json_schema` turns on the provider's structured-output mode: Gemini's
+    response_schema, OpenAI's json_schema response format, or a forced
+    Anthropic tool call whose input is returned as JSON text.
+    """
+    model = model or LLM_MODEL
+    blocks = [system_prompt] if isinstance(system_prompt, str) else system_prompt
+    system_prompt = "\n\n".join(blocks)
+    with _llm_slots:
+        if LLM_PROVIDER == "gemini":
+            return _call_gemini(system_prompt, user_message, model, json_schema)
+        elif LLM_PROVIDER == "anthropic":
+            return _call_anthropic(blocks, user_message, model, json_schema)
+        elif LLM_PROVIDER == "openai":
+            return _call_openai(system_prompt, user_message, model, cache_key, json_schema)
+        else:
+            raise RuntimeError(f"Unknown LLM_PROVIDER: {LLM_PROVIDER}")
+
+
+LLM_MAX_RETRIES = 2
+LLM_RETRY_BASE_DELAY = 0.5  # seconds
+
+
+class LLMError(Exception):
+    """The provider call or JSON parsing still failed after retries."""
+
+
+def call_llm_json(
+    system_prompt: str | list[str],
+    user_message: str,
+    cache_key: str = "",
+    model: str = "",
+    schema: dict | None = None,
+) -> dict:
+    """
+    Call the LLM and parse the response as JSON.
+    With `schema`, every provider is constrained to it, so the prompt only
+    needs to explain the fields; without one, the system prompt must
+    instruct the model to reply with valid JSON only.
+    Transient failures (provider errors, unparseable output) are retried
+    with jittered exponential backoff, then raised as LLMError.
     """
-    if LLM_PROVIDER == "gemini":
-        return _call_gemini(system_prompt, user_message)
-    elif LLM_PROVIDER == "anthropic":
-        return _call_anthropic(system_prompt, user_message)
-    elif LLM_PROVIDER == "openai":
-        return _call_openai(system_prompt, user_message)
-    else:
-        raise RuntimeError(f"Unknown LLM_PROVIDER: {LLM_PROVIDER}")
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            raw = call_llm(system_prompt, user_message, cache_key, model, schema)
+            # Strip markdown code fences if present
+            cleaned = raw.strip()
+            if cleaned.startswith("```"):
+                cleaned = _FENCE_RE.sub("", cleaned)
+            return orjson.loads(cleaned)
+        except RuntimeError:
+            raise  # Misconfiguration — retrying won't help
+        except Exception as e:
+            if attempt == LLM_MAX_RETRIES:
+                raise LLMError(str(e)) from e
+            time.sleep(random.uniform(0, LLM_RETRY_BASE_DELAY * 2 ** attempt))
+
+
+# ── Circuit Breaker ──────────────────────────────────────────────────
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM while the breaker is open."""
 
 
-def call_llm_json(system_prompt: str, user_message: str) -> dict:
+class CircuitBreaker:
     """
-    Call the LLM and parse the response as JSON.
-    The system prompt should instruct the model to reply with valid JSON only.
+    Trips after `fail_max` consecutive failures and short-circuits calls
+    with CircuitOpenError for `reset_timeout` seconds. After the cool-down
+    one trial call is let through: success closes the breaker, failure
+    re-opens it.
     """
-    raw = call_llm(system_prompt, user_message)
-    # Strip markdown code fences if present
-    cleaned = raw.strip()
-    if cleaned.startswith("```"):
-        lines = cleaned.split("\n")
-        lines = [l for l in lines if not l.strip().startswith("```")]
-        cleaned = "\n".join(lines)
-    return json.loads(cleaned)
+
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 60.0):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def call(self, fn, *args, **kwargs):
+        with self._lock:
+            if self._failures >= self.fail_max:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError("LLM circuit breaker is open")
+                self._opened_at = time.monotonic()  # Half-open: one trial per cool-down
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._failures += 1
+                if self._failures >= self.fail_max:
+                    self._opened_at = time.monotonic()
+            raise
+        with self._lock:
+            self._failures = 0
+        return result
+
+
+llm_breaker = CircuitBreaker(fail_max=5, reset_timeout=60.0)
 
 
 # ── Provider implementations ─────────────────────────────────────────
 
-def _call_gemini(system_prompt: str, user_message: str) -> str:
+# SDK clients are thread-safe and hold a connection pool, so each provider's
+# client is built once and shared; TLS handshakes are paid once per process.
+
+@lru_cache(maxsize=None)
+def _gemini_client():
     from google import genai
+    return genai.Client(api_key=GEMINI_API_KEY)
 
-    client = genai.Client(api_key=GEMINI_API_KEY)
+
+@lru_cache(maxsize=None)
+def _anthropic_client():
+    import anthropic
+    return anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+
+
+@lru_cache(maxsize=None)
+def _openai_client():
+    import openai
+    return openai.OpenAI(api_key=OPENAI_API_KEY)
+
+
+def _call_gemini(system_prompt: str, user_message: str, model: str, json_schema: dict | None = None) -> str:
+    from google import genai
+
+    client = _gemini_client()
     response = client.models.generate_content(
-        model=LLM_MODEL,
+        model=model,
         config=genai.types.GenerateContentConfig(
             system_instruction=system_prompt,
             max_output_tokens=1024,
+            **({"response_mime_type": "application/json", "response_schema": json_schema} if json_schema else {}),
         ),
         contents=user_message,
     )
     return response.text
 
 
-def _call_anthropic(system_prompt: str, user_message: str) -> str:
-    import anthropic
-
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+def _call_anthropic(
+    system_blocks: list[str],
+    user_message: str,
+    model: str,
+    json_schema: dict | None = None,
+) -> str:
+    client = _anthropic_client()
+    # Anthropic has no JSON mode; forcing a single tool call gets the same guarantee
+    tool_args = {}
+    if json_schema:
+        tool_args = {
+            "tools": [{"name": "respond", "description": "Return the response.", "input_schema": json_schema}],
+            "tool_choice": {"type": "tool", "name": "respond"},
+        }
     message = client.messages.create(
-        model=LLM_MODEL,
+        model=model,
         max_tokens=1024,
-        system=system_prompt,
+        system=[
+            # The API allows at most 4 cache breakpoints per request
+            {"type": "text", "text": block, **({"cache_control": {"type": "ephemeral"}} if i < 4 else {})}
+            for i, block in enumerate(system_blocks)
+        ],
         messages=[{"role": "user", "content": user_message}],
+        **tool_args,
     )
+    if json_schema:
+        tool_use = next(block for block in message.content if block.type == "tool_use")
+        return orjson.dumps(tool_use.input).decode()
     return message.content[0].text
 
 
-def _call_openai(system_prompt: str, user_message: str) -> str:
+def _call_openai(
+    system_prompt: str,
+    user_message: str,
+    model: str,
+    cache_key: str = "",
+    json_schema: dict | None = None,
+) -> str:
     import openai
 
-    client = openai.OpenAI(api_key=OPENAI_API_KEY)
+    client = _openai_client()
     response = client.chat.completions.create(
-        model=LLM_MODEL,
+        model=model,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_message},
         ],
         max_tokens=1024,
+        response_format=(
+            {"type": "json_schema", "json_schema": {"name": "response", "schema": json_schema}}
+            if json_schema else openai.NOT_GIVEN
+        ),
+        extra_body={"prompt_cache_key": cache_key} if cache_key else None,
     )
     return response.choices[0].message.content
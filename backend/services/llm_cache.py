@@ -0,0 +1,66 @@
+"""
+Beauty OS — LLM Response Cache
+
+Exact-match cache for `call_llm_json` results, persisted in SQLite so hits
+survive restarts and are shared between the API and scheduler processes.
+Keys are a SHA-256 of (model, system prompt, user message); only successful,
+parsed responses are stored. A small in-process layer in front of SQLite
+serves hot keys (e.g. a burst of "yes" policy confirmations) without a query.
+"""
+
+import hashlib
+import itertools
+from collections import Counter
+from collections.abc import Callable
+
+import orjson
+
+from backend.cache import TTLCache
+from backend.database import get_llm_cache, set_llm_cache, prune_llm_cache
+
+LLM_CACHE_MAX_ENTRIES = 20_000
+_PRUNE_EVERY = 500  # writes
+
+# Kept well under every caller's TTL; a memory hit can outlive its SQLite TTL by at most this
+_MEMORY_TTL = 300
+_memory = TTLCache(maxsize=2048, ttl=_MEMORY_TTL)
+
+_writes = itertools.count(1)
+_stats = Counter()
+
+
+def make_key(system_prompt: str | list[str], user_message: str, model: str = "") -> str:
+    if isinstance(system_prompt, list):
+        system_prompt = "\x1f".join(system_prompt)
+    return hashlib.sha256(f"{model}\x00{system_prompt}\x00{user_message}".encode()).hexdigest()
+
+
+def get_or_compute(key: str, fn: Callable[[], dict], ttl: int) -> dict:
+    """
+    Return the cached result for `key` if fresher than `ttl` seconds, else call
+    `fn` and cache it. Each call returns a fresh dict, so callers may mutate it.
+    """
+    cached = _memory.get(key) if ttl >= _MEMORY_TTL else None
+    if cached is not None:
+        _stats["memory_hits"] += 1
+        return orjson.loads(cached)
+
+    cached = get_llm_cache(key, max_age_sec=ttl)
+    if cached is not None:
+        _stats["hits"] += 1
+        _memory.set(key, cached)
+        return orjson.loads(cached)
+
+    _stats["misses"] += 1
+    result = fn()
+    value = orjson.dumps(result).decode()
+    set_llm_cache(key, value)
+    _memory.set(key, value)
+    if next(_writes) % _PRUNE_EVERY == 0:
+        prune_llm_cache(LLM_CACHE_MAX_ENTRIES)
+    return result
+
+
+def stats() -> dict:
+    """Hit/miss counters since process start."""
+    return {"memory_hits": 0, "hits": 0, "misses": 0, **_stats}
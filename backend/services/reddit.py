@@ -5,7 +5,14 @@ Searches subreddits for beauty service recommendations using PRAW.
 Free tier: unlimited reads, rate-limited writes.
 """
 
+import logging
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
 import praw
+from backend.ratelimit import TokenBucket
 from config.settings import (
     REDDIT_CLIENT_ID,
     REDDIT_CLIENT_SECRET,
@@ -14,6 +21,34 @@ from config.settings import (
     REDDIT_PASSWORD,
 )
 
+logger = logging.getLogger(__name__)
+
+# PRAW clients aren't thread-safe, so each worker checks one out of a pool.
+# Kept small because all workers share the app's OAuth rate limit.
+_SEARCH_WORKERS = 4
+
+# Shared across workers: OAuth apps get ~100 requests/minute. A search
+# listing can page, so this paces search calls a little under that.
+_search_limiter = TokenBucket(capacity=10, refill_rate_per_sec=1)
+
+# Idle read-only clients; reusing them keeps their OAuth token and HTTP session
+_read_clients: queue.SimpleQueue = queue.SimpleQueue()
+
+# Smallest Reddit search window covering a gap, in seconds
+_TIME_FILTERS = [
+    ("hour", 3600),
+    ("day", 86400),
+    ("week", 7 * 86400),
+    ("month", 31 * 86400),
+    ("year", 366 * 86400),
+]
+
+# Keywords are OR-ed into combined queries to cut search round-trips;
+# Reddit rejects queries much over 512 characters.
+_MAX_QUERY_TERMS = 8
+_MAX_QUERY_CHARS = 480
+_MAX_LISTING_LIMIT = 1000
+
 
 def _get_reddit_client(read_only: bool = True) -> praw.Reddit:
     """Initialize and return a PRAW Reddit instance."""
@@ -33,11 +68,26 @@ def _get_reddit_client(read_only: bool = True) -> praw.Reddit:
         )
 
 
+@contextmanager
+def _read_only_client():
+    """Borrow a read-only PRAW client for the current thread, returning it afterwards."""
+    try:
+        reddit = _read_clients.get_nowait()
+    except queue.Empty:
+        reddit = _get_reddit_client(read_only=True)
+    try:
+        yield reddit
+    finally:
+        _read_clients.put(reddit)
+
+
 def search_subreddits(
     subreddits: list[str],
     keywords: list[str],
     limit: int = 25,
     time_filter: str = "week",
+    after_utc: dict[str, float] | None = None,
+    complete: set[str] | None = None,
 ) -> list[dict]:
     """
     Search multiple subreddits for posts matching beauty service keywords.
@@ -47,23 +97,80 @@ def search_subreddits(
         keywords: List of search terms (e.g., ["wax", "lash", "nail salon"])
         limit: Max results per subreddit per keyword
         time_filter: "hour", "day", "week", "month", "year", "all"
+        after_utc: Optional {subreddit: unix time} cursors. Subreddits with a
+            cursor are searched newest-first and only posts created after
+            it are returned; `time_filter` is narrowed to cover the gap.
+        complete: Optional set, filled with the subreddits whose search ran
+            without errors and, for cursored ones, covered everything since
+            the cursor. Only these subreddits' cursors are safe to advance.
 
     Returns:
         List of dicts with post info.
     """
     if not REDDIT_CLIENT_ID:
-        print("[Social Hunter] REDDIT_CLIENT_ID not configured — skipping Reddit search.")
+        logger.info("REDDIT_CLIENT_ID not configured — skipping Reddit search.")
+        return []
+    if not subreddits:
         return []
 
-    reddit = _get_reddit_client(read_only=True)
+    # Subreddits are searched concurrently; results keep subreddit order
+    with ThreadPoolExecutor(max_workers=min(_SEARCH_WORKERS, len(subreddits))) as ex:
+        per_subreddit = ex.map(
+            lambda sub_name: _search_subreddit(
+                sub_name, keywords, limit, time_filter, (after_utc or {}).get(sub_name),
+            ),
+            subreddits,
+        )
+        results = []
+        seen_ids = set()
+        for sub_name, (posts, sub_complete) in zip(subreddits, per_subreddit):
+            if sub_complete and complete is not None:
+                complete.add(sub_name)
+            for post in posts:
+                if post["id"] in seen_ids:
+                    continue
+                seen_ids.add(post["id"])
+                results.append(post)
+
+    return results
+
+
+def _search_subreddit(
+    sub_name: str,
+    keywords: list[str],
+    limit: int,
+    time_filter: str,
+    after_utc: float | None = None,
+) -> tuple[list[dict], bool]:
+    """
+    Run the OR-combined keyword searches against one subreddit on a pooled PRAW client.
+
+    Returns (posts, complete). With a cursor, `complete` means every query's
+    newest-first listing reached `after_utc` or ran out before its limit;
+    without one it just means no search failed.
+    """
     results = []
     seen_ids = set()
+    complete = True
+
+    sort = "relevance"
+    if after_utc is not None:
+        sort = "new"
+        gap = time.time() - after_utc
+        time_filter = next((name for name, span in _TIME_FILTERS if gap <= span), "all")
 
-    for sub_name in subreddits:
-        try:
+    try:
+        with _read_only_client() as reddit:
             subreddit = reddit.subreddit(sub_name)
-            for keyword in keywords:
-                for post in subreddit.search(keyword, limit=limit, time_filter=time_filter):
+            for query, terms in _combined_queries(keywords):
+                # Keep roughly the per-keyword recall of separate searches
+                query_limit = min(limit * terms, _MAX_LISTING_LIMIT)
+                _search_limiter.acquire()
+                fetched = 0
+                for post in subreddit.search(query, sort=sort, limit=query_limit, time_filter=time_filter):
+                    fetched += 1
+                    if after_utc is not None and post.created_utc <= after_utc:
+                        break  # sorted newest-first: everything after this was already scanned
                     if post.id in seen_ids:
                         continue
                     seen_ids.add(post.id)
@@ -79,11 +186,35 @@ def search_subreddits(
                         "num_comments": post.num_comments,
                         "created_utc": post.created_utc,
                     })
-        except Exception as e:
-            print(f"[Social Hunter] Error searching r/{sub_name}: {e}")
-            continue
+                else:
+                    # Stopped at the limit before reaching the cursor: older new posts were missed
+                    if after_utc is not None and fetched >= query_limit:
+                        complete = False
+    except Exception as e:
+        logger.warning("Error searching r/%s: %s", sub_name, e)
+        complete = False
 
-    return results
+    return results, complete
+
+
+def _combined_queries(keywords: list[str]) -> list[tuple[str, int]]:
+    """
+    Group keywords into `a OR "b c" OR ...` queries.
+    Returns (query, number of keywords in it) pairs.
+    """
+    queries = []
+    group: list[str] = []
+    length = 0
+    for keyword in dict.fromkeys(k.strip() for k in keywords if k.strip()):
+        term = f'"{keyword}"' if " " in keyword else keyword
+        if group and (len(group) >= _MAX_QUERY_TERMS or length + len(term) + 4 > _MAX_QUERY_CHARS):
+            queries.append((" OR ".join(group), len(group)))
+            group, length = [], 0
+        group.append(term)
+        length += len(term) + 4
+    if group:
+        queries.append((" OR ".join(group), len(group)))
+    return queries
 
 
 def reply_to_post(post_id: str, reply_text: str) -> dict:
@@ -116,6 +247,5 @@ def reply_to_post(post_id: str, reply_text: str) -> dict:
 
 def reply_to_post_dry_run(post_id: str, reply_text: str) -> dict:
     """Simulate posting a Reddit reply (for testing without credentials)."""
-    print(f"[DRY RUN Reddit] Post ID: {post_id}")
-    print(f"[DRY RUN Reddit] Reply: {reply_text[:200]}")
+    logger.info("[DRY RUN Reddit] Post ID: %s, reply: %.200s", post_id, reply_text)
     return {"posted": False, "dry_run": True, "post_id": post_id}
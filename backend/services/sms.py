@@ -1,17 +1,62 @@
 """
 Beauty OS — SMS Service (Twilio)
+
+Outbound sends are paced by a token bucket per sending number, so bursts
+(a large upsell window, a waitlist blast) stay under Twilio's long-code MPS
+cap. Every studio currently sends from TWILIO_PHONE_NUMBER, so in practice
+that is one bucket shared by all studios and all send paths.
+Webhook-driven sends go through `queue_sms`, which returns immediately and
+retries throttled or unsent messages in the background.
 """
 
-from config.settings import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER
+import logging
+import queue
+import random
+import threading
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from config.settings import (
+    TWILIO_ACCOUNT_SID,
+    TWILIO_AUTH_TOKEN,
+    TWILIO_PHONE_NUMBER,
+    SMS_MPS,
+    SMS_BURST,
+)
+from backend.ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+# ── Rate Limiting ────────────────────────────────────────────────────
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
 
 
-def send_sms(to: str, body: str) -> str:
+def _get_bucket(from_number: str) -> TokenBucket:
+    """One bucket per sending number: Twilio's MPS cap applies to the number, not the studio."""
+    with _buckets_lock:
+        bucket = _buckets.get(from_number)
+        if bucket is None:
+            bucket = TokenBucket(capacity=SMS_BURST, refill_rate_per_sec=SMS_MPS)
+            _buckets[from_number] = bucket
+        return bucket
+
+
+# ── Sending ──────────────────────────────────────────────────────────
+
+def send_sms(to: str, body: str, studio_id: str = "") -> str:
     """
     Send an SMS via Twilio.
+    Blocks until the sending number's rate limiter allows another message.
     Returns the message SID on success.
     """
     from twilio.rest import Client
 
+    _get_bucket(TWILIO_PHONE_NUMBER).acquire()
+
     client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
     message = client.messages.create(
         body=body,
@@ -21,8 +66,74 @@ def send_sms(to: str, body: str) -> str:
     return message.sid
 
 
+# ── Background Queue ─────────────────────────────────────────────────
+
+SMS_MAX_RETRIES = 5
+SMS_RETRY_BACKOFF_MAX = 300  # seconds
+_SMS_WORKERS = 4
+
+_sms_queue: queue.Queue = queue.Queue()
+_workers_started = False
+_workers_lock = threading.Lock()
+
+
+def queue_sms(to: str, body: str, studio_id: str = "") -> str:
+    """
+    Enqueue an SMS for background delivery and return immediately.
+    Returns "queued" in place of a Twilio SID.
+    """
+    _ensure_workers()
+    _sms_queue.put((to, body, studio_id, 0))
+    return "queued"
+
+
+def _ensure_workers():
+    global _workers_started
+    with _workers_lock:
+        if _workers_started:
+            return
+        for i in range(_SMS_WORKERS):
+            threading.Thread(target=_sms_worker, name=f"sms-worker-{i}", daemon=True).start()
+        _workers_started = True
+
+
+def _sms_worker():
+    while True:
+        to, body, studio_id, attempt = _sms_queue.get()
+        try:
+            send_sms(to=to, body=body, studio_id=studio_id)
+        except Exception as e:
+            if getattr(e, "status", None) == 429:
+                _get_bucket(TWILIO_PHONE_NUMBER).penalize()
+            if attempt >= SMS_MAX_RETRIES or not _is_retryable(e):
+                logger.warning("Giving up on message to %s after %d attempt(s): %s", to, attempt + 1, e)
+                continue
+            # Exponential backoff with full jitter
+            delay = random.uniform(0, min(SMS_RETRY_BACKOFF_MAX, 2 ** attempt))
+            timer = threading.Timer(delay, _sms_queue.put, args=((to, body, studio_id, attempt + 1),))
+            timer.daemon = True
+            timer.start()
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """
+    Retry only failures where Twilio can't have accepted the message: a 429,
+    or a connection that was never opened. Creating a message isn't
+    idempotent, so a 5xx or a drop after the POST went out may already have
+    delivered it, and resending would text the client twice.
+    """
+    if getattr(exc, "status", None) == 429:
+        return True
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        reason = exc.args[0] if exc.args else None
+        reason = getattr(reason, "reason", reason)  # urllib3's MaxRetryError wraps the cause
+        return isinstance(reason, NewConnectionError)
+    return False
+
+
 def send_sms_dry_run(to: str, body: str) -> dict:
     """Simulate sending an SMS (for testing without Twilio credentials)."""
-    print(f"[DRY RUN SMS] To: {to}")
-    print(f"[DRY RUN SMS] Body: {body}")
+    logger.info("[DRY RUN SMS] To: %s, body: %s", to, body)
     return {"sid": "dry_run", "to": to, "body": body}
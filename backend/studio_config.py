@@ -5,13 +5,16 @@ Loads a studio's full config (name, policies, services, add-ons, brand voice)
 and provides brand-voice prompt fragments for each agent.
 """
 
+from backend.cache import TTLCache
 from backend.database import (
     get_studio_by_slug,
     get_studio_by_api_key,
     get_default_studio,
-    get_services_for_studio,
-    get_addons_for_service,
+    get_services_with_addons,
 )
+from config.settings import STUDIO_CONFIG_CACHE_TTL
+
+_config_cache = TTLCache(maxsize=256, ttl=STUDIO_CONFIG_CACHE_TTL)
 
 
 # ── Brand Voice Presets ──────────────────────────────────────────────
@@ -61,13 +64,33 @@ def get_studio_config(studio_id: str) -> dict:
     """
     Load a studio's full configuration including services + add-ons.
 
+    Results are cached for STUDIO_CONFIG_CACHE_TTL seconds; callers must
+    treat the returned dict as read-only. Writes to the studio, its
+    services or add-ons should call `invalidate_studio_config`.
+
     Returns:
         {
             "studio": { ...studio row... },
             "services": [ { ...service..., "addons": [...] } ],
             "brand_voice": { ...voice preset dict... },
+            "services_menu": str,  # pre-rendered for prompts
+            "prompts": {},  # agent system prompts, see `get_cached_prompt`
         }
     """
+    config = _config_cache.get(studio_id)
+    if config is None:
+        config = _load_studio_config(studio_id)
+        if config:
+            _config_cache.set(studio_id, config)
+    return config
+
+
+def invalidate_studio_config(studio_id: str):
+    """Drop a studio's cached config after its settings/menu change."""
+    _config_cache.pop(studio_id)
+
+
+def _load_studio_config(studio_id: str) -> dict | None:
     from backend.database import get_db
 
     with get_db() as db:
@@ -79,9 +102,7 @@ def get_studio_config(studio_id: str) -> dict:
     studio = dict(row)
 
     # Load services with their add-ons
-    services = get_services_for_studio(studio_id)
-    for svc in services:
-        svc["addons"] = get_addons_for_service(svc["id"])
+    services = get_services_with_addons(studio_id)
 
     # Resolve brand voice
     voice_key = studio.get("brand_voice", "professional_chill")
@@ -91,22 +112,52 @@ def get_studio_config(studio_id: str) -> dict:
         "studio": studio,
         "services": services,
         "brand_voice": brand_voice,
+        "services_menu": _format_services_menu(services),
+        "prompts": {},
     }
 
 
 def get_services_menu(config: dict) -> str:
     """Format the studio's services + add-ons as a readable menu for prompts."""
-    if not config or not config.get("services"):
+    if not config:
+        return _format_services_menu([])
+    # Rendered once per cached config, so prompt builders get the same string every scan
+    menu = config.get("services_menu")
+    if menu is None:
+        menu = _format_services_menu(config.get("services", []))
+    return menu
+
+
+def get_cached_prompt(config: dict, name: str, build) -> str | list[str]:
+    """
+    Return `build(config)`, built at most once per cached config.
+
+    The memo lives on the config itself, so `invalidate_studio_config` (or
+    the TTL expiring) drops stale prompts along with the stale config.
+    """
+    prompts = config.get("prompts")
+    if prompts is None:
+        return build(config)
+    prompt = prompts.get(name)
+    if prompt is None:
+        prompt = prompts[name] = build(config)
+    return prompt
+
+
+def _format_services_menu(services: list[dict]) -> str:
+    if not services:
         return "No services configured yet."
 
-    lines = []
-    for svc in config["services"]:
-        lines.append(f"• {svc['name']} — ${svc['price']:.0f} ({svc['duration_min']} min)")
-        for addon in svc.get("addons", []):
-            lines.append(f"  ↳ Add-on: {addon['name']} — ${addon['price']:.0f} ({addon['duration_min']} min)")
+    return "\n".join(_menu_lines(services))
+
+
+def _menu_lines(services: list[dict]):
+    for svc in services:
+        yield f"• {svc['name']} — ${svc['price']:.0f} ({svc['duration_min']} min)"
+        for addon in svc.get("addons", ()):
+            yield f"  ↳ Add-on: {addon['name']} — ${addon['price']:.0f} ({addon['duration_min']} min)"
             if addon.get("pitch"):
-                lines.append(f"    Pitch: \"{addon['pitch']}\"")
-    return "\n".join(lines)
+                yield f"    Pitch: \"{addon['pitch']}\""
 
 
 def get_policies_text(studio: dict) -> str:
@@ -0,0 +1,10 @@
+"""
+Beauty OS — Shared Helpers
+
+Small, dependency-free helpers used by more than one agent.
+"""
+
+
+def first_name(full_name: str) -> str:
+    """'Jane Marie Doe' → 'Jane'. Avoids the list allocation of str.split()."""
+    return full_name.strip().partition(" ")[0]
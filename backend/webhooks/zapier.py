@@ -68,17 +68,23 @@ WEBHOOK_CONTRACTS = {
 }
 
 
+# (method, path) per contract, parsed once from "beauty_os_endpoint"
+_ENDPOINTS = {
+    key: tuple(contract["beauty_os_endpoint"].split(" ", 1))
+    for key, contract in WEBHOOK_CONTRACTS.items()
+}
+
+
 def generate_make_http_config(contract_key: str, base_url: str = "https://your-beauty-os.com") -> dict:
     """
     Generate a Make.com HTTP module configuration for a given contract.
     Useful for programmatic setup of Make.com scenarios.
     """
-    contract = WEBHOOK_CONTRACTS.get(contract_key)
-    if not contract:
+    endpoint = _ENDPOINTS.get(contract_key)
+    if not endpoint:
         return {"error": f"Unknown contract: {contract_key}"}
 
-    endpoint = contract["beauty_os_endpoint"]
-    method, path = endpoint.split(" ", 1)
+    method, path = endpoint
 
     return {
         "module": "http.makeRequest",
@@ -87,11 +93,16 @@ def generate_make_http_config(contract_key: str, base_url: str = "https://your-b
         "headers": [
             {"name": "Content-Type", "value": "application/json"},
         ],
-        "body": contract["payload_schema"],
+        "body": WEBHOOK_CONTRACTS[contract_key]["payload_schema"],
         "parse_response": True,
     }
 
 
+def generate_all_make_http_configs(base_url: str = "https://your-beauty-os.com") -> dict[str, dict]:
+    """Make.com HTTP module configurations for every contract, keyed by contract."""
+    return {key: generate_make_http_config(key, base_url) for key in WEBHOOK_CONTRACTS}
+
+
 # ── Print all contracts (for documentation) ─────────────────────────
 
 if __name__ == "__main__":
@@ -21,15 +21,21 @@ ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.0-flash")
+LLM_FAST_MODEL = os.getenv("LLM_FAST_MODEL", "")  # cheaper model for classification; blank = LLM_MODEL
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))  # in-flight calls per process
 
 # ── Twilio (SMS) ─────────────────────────────────────────────────────
 TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID", "")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN", "")
 TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER", "")
+SMS_MPS = float(os.getenv("SMS_MPS", "1"))  # messages/sec per sending number (long-code cap)
+SMS_BURST = float(os.getenv("SMS_BURST", "1"))  # messages allowed back-to-back before pacing
 
 # ── Instagram Graph API ──────────────────────────────────────────────
 IG_ACCESS_TOKEN = os.getenv("IG_ACCESS_TOKEN", "")
 IG_PAGE_ID = os.getenv("IG_PAGE_ID", "")
+IG_APP_SECRET = os.getenv("IG_APP_SECRET", "")  # signs webhook payloads; blank = don't verify
+IG_VERIFY_TOKEN = os.getenv("IG_VERIFY_TOKEN", "")  # webhook subscription handshake token
 
 # ── Bookly PRO ───────────────────────────────────────────────────────
 BOOKLY_API_URL = os.getenv("BOOKLY_API_URL", "https://yourdomain.com/wp-json/bookly/v1")
@@ -39,8 +45,12 @@ BOOKLY_API_KEY = os.getenv("BOOKLY_API_KEY", "")
 DEPOSIT_AMOUNT = float(os.getenv("DEPOSIT_AMOUNT", "25.00"))
 LATE_FEE = float(os.getenv("LATE_FEE", "15.00"))
 UPSELL_LEAD_TIME_HOURS = int(os.getenv("UPSELL_LEAD_TIME_HOURS", "24"))
+UPSELL_CONCURRENCY = int(os.getenv("UPSELL_CONCURRENCY", "10"))  # bookings processed in parallel
 BOOKING_URL = os.getenv("BOOKING_URL", "https://yourdomain.com/book")
 
+# ── Caching ──────────────────────────────────────────────────────────
+STUDIO_CONFIG_CACHE_TTL = int(os.getenv("STUDIO_CONFIG_CACHE_TTL", "300"))  # seconds
+
 # ── Brand Voice ──────────────────────────────────────────────────────
 STUDIO_NAME = os.getenv("STUDIO_NAME", "The Beauty Studio")
 STUDIO_VIBE = os.getenv("STUDIO_VIBE", "professional, particular, chill")
@@ -55,6 +65,7 @@ REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET", "")
 REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT", "BeautyOS:v1.0 (by /u/beautyos_bot)")
 REDDIT_USERNAME = os.getenv("REDDIT_USERNAME", "")
 REDDIT_PASSWORD = os.getenv("REDDIT_PASSWORD", "")
+SOCIAL_HUNTER_LLM_WORKERS = int(os.getenv("SOCIAL_HUNTER_LLM_WORKERS", "8"))  # parallel evaluations per scan
 
 # ── Google Maps (Social Hunter) ──────────────────────────────────
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY", "")